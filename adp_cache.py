@@ -0,0 +1,162 @@
+import os
+import pickle
+import threading
+import time
+from functools import partial
+
+import pandas as pd
+import requests
+
+import fetch
+import metrics
+
+# On-disk ADP snapshot store shared by the rankings page, /draft and load_rankings.
+# Each source page is parsed once per change upstream; within the TTL reads are a
+# dict lookup, and after it we revalidate with ETag / Last-Modified so a 304 reuses
+# the cached parse instead of re-downloading and re-parsing the page.
+ADP_CACHE_DIR = os.environ.get("ADP_CACHE_DIR", ".adp_cache")
+ADP_CACHE_TTL = float(os.environ.get("ADP_CACHE_TTL", "300"))  # seconds
+ADP_RETRY_AFTER = 30  # seconds before retrying a source whose fetch failed
+
+_snapshots = {}  # { name: {"df": DataFrame, "etag": str, "last_modified": str, "expires": float, "version": float} }
+metrics.describe("adp_snapshot_revalidations_total", "counter",
+                 "Expired ADP snapshots revalidated upstream, by source and result.")
+
+_locks = {}      # { name: threading.Lock } so concurrent misses refetch a source once
+_locks_guard = threading.Lock()
+
+
+def _lock_for(name):
+    with _locks_guard:
+        lock = _locks.get(name)
+        if lock is None:
+            lock = _locks[name] = threading.Lock()
+        return lock
+
+
+def _snapshot_path(name):
+    return os.path.join(ADP_CACHE_DIR, f"{name}.pkl")
+
+
+def _load_from_disk(name):
+    path = _snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_to_disk(name, entry):
+    os.makedirs(ADP_CACHE_DIR, exist_ok=True)
+    path = _snapshot_path(name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # Atomic swap so other workers never read a half-written snapshot
+    os.replace(tmp, path)
+
+
+def _is_fresh(entry, now):
+    return entry is not None and now < entry["expires"]
+
+
+def _failed(entry):
+    # Serve whatever we had (or an empty frame) and back off before the next attempt
+    retry_at = time.time() + ADP_RETRY_AFTER
+    if entry is None:
+        return {"df": pd.DataFrame(), "etag": None, "last_modified": None, "expires": retry_at, "version": None}
+    return dict(entry, expires=retry_at)
+
+
+def _revalidate(name, url, parse, entry, timeout=None):
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        response = fetch.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        metrics.inc("adp_snapshot_revalidations_total", source=name, result="failed")
+        return _failed(entry)
+    now = time.time()
+    if response.status_code == 304 and entry is not None and entry["version"] is not None:
+        # Unchanged upstream: keep the parsed frame, just extend its lifetime
+        metrics.inc("adp_snapshot_revalidations_total", source=name, result="not_modified")
+        entry = dict(entry, expires=now + ADP_CACHE_TTL)
+        _save_to_disk(name, entry)
+        return entry
+    if response.status_code != 200:
+        metrics.inc("adp_snapshot_revalidations_total", source=name, result="failed")
+        return _failed(entry)
+    metrics.inc("adp_snapshot_revalidations_total", source=name, result="updated")
+    with metrics.span("parse"):
+        df = parse(response.text)
+    entry = {
+        "df": df,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "expires": now + ADP_CACHE_TTL,
+        "version": now,
+    }
+    _save_to_disk(name, entry)
+    return entry
+
+
+def get_snapshot(name, url, parse, timeout=None):
+    """Return the parsed DataFrame for ``url``, refetching only when the TTL has lapsed."""
+    now = time.time()
+    entry = _snapshots.get(name)
+    if _is_fresh(entry, now):
+        return entry["df"]
+    with _lock_for(name):
+        # Another thread may have refreshed while we waited on the lock
+        entry = _snapshots.get(name)
+        if _is_fresh(entry, time.time()):
+            return entry["df"]
+        if entry is None:
+            entry = _load_from_disk(name)
+        if not _is_fresh(entry, time.time()):
+            entry = _revalidate(name, url, parse, entry, timeout)
+        _snapshots[name] = entry
+        return entry["df"]
+
+
+def get_snapshots(sources, deadline=None):
+    """Return ``{name: DataFrame}`` for ``{name: (url, parse, timeout)}``.
+
+    Stale sources are revalidated in parallel, so a cold load costs the slowest
+    source rather than the sum of them. A source that fails or misses the
+    deadline yields its previous snapshot, or an empty frame if it has none.
+    """
+    now = time.time()
+    stale = {
+        name: partial(get_snapshot, name, *src)
+        for name, src in sources.items()
+        # Skip sources already being refreshed by another request
+        if not _is_fresh(_snapshots.get(name), now) and not _lock_for(name).locked()
+    }
+    if stale:
+        with metrics.span("fetch"):
+            fetch.run_parallel(stale, deadline)
+    return {
+        name: _snapshots[name]["df"] if name in _snapshots else pd.DataFrame()
+        for name in sources
+    }
+
+
+def snapshot_version(*names):
+    """Version stamp of the named snapshots; changes only when a source is re-parsed."""
+    return tuple(_snapshots[n]["version"] if n in _snapshots else None for n in names)
+
+
+def invalidate(name=None):
+    """Drop in-memory snapshots; the next read reloads from disk and revalidates if stale."""
+    if name is None:
+        _snapshots.clear()
+    else:
+        _snapshots.pop(name, None)
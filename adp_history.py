@@ -0,0 +1,122 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# ADP history: every ADP snapshot is folded into an append-only change log,
+# one row per (platform, player) only when their ADP differs from the last
+# value stored, so storage grows with real movement rather than with fetches.
+# adp_latest holds the current value per (platform, player) for that check.
+#
+# Trend queries run against an in-process columnar copy of one platform's log
+# (player id, time and ADP arrays sorted by player then time), loaded once and
+# reloaded only after this process ingests a snapshot. "ADP N days ago" is then
+# one vectorized as-of lookup, cached per platform, window and day.
+TREND_DAYS = 7
+_TREND_CACHE_MAX = 64
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS adp_history ("
+    " platform TEXT NOT NULL, player_id INTEGER NOT NULL, ts INTEGER NOT NULL, adp REAL,"
+    " PRIMARY KEY (platform, player_id, ts)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS adp_latest ("
+    " platform TEXT NOT NULL, player_id INTEGER NOT NULL, adp REAL,"
+    " PRIMARY KEY (platform, player_id)) WITHOUT ROWID",
+]
+_ready = False
+_generation = {}  # { platform: int } bumped by each ingest
+_columns = {}     # { platform: (generation, ids, ts, adp) }
+_trends = {}      # { (platform, generation, days, day): Series }
+_lock = threading.Lock()
+
+
+def _ensure_schema():
+    global _ready
+    if not _ready:
+        for sql in _SCHEMA:
+            db.execute(sql)
+        _ready = True
+
+
+def ingest(platform_values, ts=None):
+    """Record ``{platform: Series of ADP indexed by player_id}``; only changed values are stored.
+
+    Returns the number of rows appended.
+    """
+    _ensure_schema()
+    ts = int(time.time() if ts is None else ts)
+    added = 0
+    with db.lock:
+        for platform, values in platform_values.items():
+            values = pd.to_numeric(values, errors="coerce").dropna()
+            values = values[~values.index.duplicated()]
+            last = dict(db.query("SELECT player_id, adp FROM adp_latest WHERE platform = ?", (platform,)))
+            rows = [
+                (platform, int(pid), ts, float(adp))
+                for pid, adp in zip(values.index.tolist(), values.tolist())
+                if last.get(pid) != adp
+            ]
+            # Bumped even with nothing new: another worker may have stored it first
+            _generation[platform] = _generation.get(platform, 0) + 1
+            if not rows:
+                continue
+            db.executemany("INSERT OR IGNORE INTO adp_history (platform, player_id, ts, adp) VALUES (?, ?, ?, ?)", rows)
+            db.executemany("INSERT OR REPLACE INTO adp_latest (platform, player_id, adp) VALUES (?, ?, ?)",
+                           [(p, pid, adp) for p, pid, _, adp in rows])
+            added += len(rows)
+    return added
+
+
+def _history(platform):
+    generation = _generation.get(platform, 0)
+    cached = _columns.get(platform)
+    if cached and cached[0] == generation:
+        return cached
+    _ensure_schema()
+    rows = db.query("SELECT player_id, ts, adp FROM adp_history WHERE platform = ? ORDER BY player_id, ts", (platform,))
+    arr = np.array(rows, dtype=float).reshape(-1, 3)
+    cached = _columns[platform] = (generation, arr[:, 0].astype(np.int64), arr[:, 1].astype(np.int64), arr[:, 2])
+    return cached
+
+
+def version(platform):
+    """Changes whenever ``trend(platform)`` can: after an ingest and at each new day."""
+    return _generation.get(platform, 0), int(time.time() // 86400)
+
+
+def trend(platform, days=TREND_DAYS):
+    """ADP N days ago minus ADP now, by player id: positive means rising (drafted earlier).
+
+    A player tracked for less than ``days`` is compared with their first
+    recorded ADP.
+    """
+    generation, day = version(platform)
+    key = (platform, generation, days, day)
+    with _lock:
+        result = _trends.get(key)
+        if result is not None:
+            return result
+        _, ids, ts, adp = _history(platform)
+        if not len(ids):
+            result = pd.Series(dtype=float, index=pd.Index([], dtype=np.int64, name="player_id"))
+        else:
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            ends = np.r_[starts[1:], len(ids)]
+            # One sorted int64 key per row (player segment, then time) makes
+            # "last change at or before the cutoff" a single searchsorted
+            t0 = ts.min()
+            span = int(ts.max() - t0) + 2
+            segment = np.repeat(np.arange(len(starts), dtype=np.int64), ends - starts)
+            cutoff = min(max(int(time.time() - days * 86400 - t0), -1), span - 1)
+            before = np.searchsorted(segment * span + (ts - t0), np.arange(len(starts), dtype=np.int64) * span + cutoff,
+                                     side="right") - 1
+            # A player first seen after the cutoff is compared with their first value
+            then = adp[np.maximum(before, starts)]
+            result = pd.Series(then - adp[ends - 1], index=pd.Index(ids[starts], name="player_id"))
+        if len(_trends) >= _TREND_CACHE_MAX:
+            _trends.clear()
+        _trends[key] = result
+        return result
@@ -0,0 +1,154 @@
+import os
+import re
+
+import pandas as pd
+
+import adp_history
+import fetch
+import metrics
+from adp_cache import get_snapshots, snapshot_version
+from players import player_ids
+from table_extract import extract_table
+
+# Registered ADP source pages. Each adapter fetches one page and parses it into
+# a frame keyed by KEY_COLS; every other non-meta column is a platform's ADP.
+# All sources are merged once per snapshot into one wide frame, so picking a
+# platform is just a column projection.
+KEY_COLS = ["Player Team (Bye)", "POS"]
+NON_PLATFORM_COLS = {"Rank", "AVG", "Team", "Player Team (Bye)", "POS"}
+ADP_SOURCE_TIMEOUT = (3.05, 10)  # (connect, read) seconds per source page
+
+ADP_SOURCES = {}  # { name: {"url", "parse", "timeout", "label"} }
+_wide_cache = {}  # { "version": tuple, "df": DataFrame, "platforms": dict }
+_ingested = {}    # { "version": tuple } last snapshot recorded in the ADP history
+
+
+def clean_pos_column(df):
+    if "POS" in df.columns:
+        df = df.copy()
+        df["POS"] = df["POS"].str.replace(r"\d+", "", regex=True)
+    return df
+
+
+def parse_adp_table(html):
+    return clean_pos_column(extract_table(html, "data"))
+
+
+def register_adp_source(name, url, parse=parse_adp_table, timeout=ADP_SOURCE_TIMEOUT, label=None):
+    """Register an ADP page. ``parse(text)`` must return a frame with KEY_COLS.
+
+    ``label`` disambiguates platform columns that an earlier source already
+    provides, e.g. "RTSports" on the best-ball page becomes "RTSports (Best Ball)".
+    """
+    ADP_SOURCES[name] = {"url": url, "parse": parse, "timeout": timeout, "label": label or name}
+    _wide_cache.clear()
+
+
+register_adp_source("overall", "https://www.fantasypros.com/nfl/adp/overall.php")
+register_adp_source("best-ball-overall", "https://www.fantasypros.com/nfl/adp/best-ball-overall.php", label="Best Ball")
+
+
+def source_frames():
+    """Parsed frame per source; stale ones are refetched in parallel, failed ones are empty."""
+    return get_snapshots({
+        name: (src["url"], src["parse"], src["timeout"]) for name, src in ADP_SOURCES.items()
+    })
+
+
+def fixture_frames(directory):
+    """Parse saved source pages (``<directory>/<name>.html``) instead of fetching them."""
+    frames = {}
+    for name, src in ADP_SOURCES.items():
+        path = os.path.join(directory, f"{name}.html")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                frames[name] = src["parse"](f.read())
+    return frames
+
+
+def record_fixtures(directory):
+    """Save the live source pages as ``<directory>/<name>.html`` for offline mode (fetch.FIXTURES_DIR)."""
+    os.makedirs(directory, exist_ok=True)
+    saved = []
+    for name, src in ADP_SOURCES.items():
+        response = fetch.get(src["url"], timeout=src["timeout"])
+        if response.status_code == 200:
+            with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+                f.write(response.text)
+            saved.append(name)
+    return saved
+
+
+def adp_version():
+    # Touch the snapshots so an expired TTL revalidates before we compare versions
+    source_frames()
+    return snapshot_version(*ADP_SOURCES)
+
+
+def platform_key(column):
+    return re.sub(r"[^a-z0-9]+", "-", column.lower()).strip("-")
+
+
+@metrics.timed("merge")
+def _build_wide(frames):
+    merged = None
+    for name, df in frames.items():
+        # A source that failed to load is left out rather than blanking the page
+        if not all(col in df.columns for col in KEY_COLS):
+            continue
+        part = df[KEY_COLS + [c for c in df.columns if c not in NON_PLATFORM_COLS]]
+        # Resolve every row to its canonical id so sources join on an integer
+        # even when they spell a name differently
+        part = part.assign(player_id=player_ids(part["Player Team (Bye)"], part["POS"]))
+        part = part.drop_duplicates("player_id")
+        if merged is not None:
+            part = part.rename(columns={
+                c: f"{c} ({ADP_SOURCES[name]['label']})"
+                for c in part.columns if c in merged.columns and c not in KEY_COLS + ["player_id"]
+            })
+            merged = pd.merge(merged, part, on="player_id", how="outer", suffixes=("", "_src"))
+            # Players only this source lists take their name / POS from it
+            for col in KEY_COLS:
+                merged[col] = merged[col].fillna(merged.pop(f"{col}_src"))
+        else:
+            merged = part.copy()
+    if merged is None:
+        return pd.DataFrame()
+    return merged.reset_index(drop=True)
+
+
+def wide_adp_frame(frames=None):
+    """One row per player, one ADP column per platform across all sources.
+
+    Built once per snapshot version and shared; callers must not mutate it.
+    Passing ``frames`` (e.g. from fixture_frames) builds an uncached frame from them.
+    """
+    if frames is not None:
+        return _build_wide(frames)
+    frames = source_frames()
+    version = snapshot_version(*ADP_SOURCES)
+    if _wide_cache.get("version") != version:
+        df = _build_wide(frames)
+        platforms = {platform_key(c): c for c in df.columns if c not in KEY_COLS + ["player_id"]}
+        _wide_cache.update(version=version, df=df, platforms=platforms)
+        # Keep the movement: each new snapshot goes into the ADP history
+        # (once: a rebuild of the same snapshot has nothing new)
+        if not df.empty and _ingested.get("version") != version:
+            _ingested["version"] = version
+            ids = pd.Index(df["player_id"], name="player_id")
+            adp_history.ingest(
+                {key: pd.Series(df[col].to_numpy(), index=ids) for key, col in platforms.items()},
+                ts=max((v for v in version if v is not None), default=None),
+            )
+    return _wide_cache["df"]
+
+
+def platforms():
+    """``{platform key: column name}`` for every platform in the current snapshot."""
+    wide_adp_frame()
+    return dict(_wide_cache["platforms"])
+
+
+def platform_column(platform):
+    wide_adp_frame()
+    return _wide_cache["platforms"].get(platform)
@@ -0,0 +1,64 @@
+"""Benchmark POS Rank computation: the old iterrows scan vs the vectorized engine.
+
+Run from the repo root:  python benchmarks/bench_pos_rank.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import add_pos_rank, move_player  # noqa: E402
+
+SIZES = [300, 3_000, 30_000]
+LEGACY_MAX_ROWS = 3_000  # the O(n^2) scan takes minutes beyond this
+
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pos = rng.choice(["QB", "RB", "WR", "TE", "K", "DST"], size=n, p=[0.12, 0.27, 0.35, 0.14, 0.06, 0.06])
+    return pd.DataFrame({
+        "Player Team (Bye)": [f"Player {i} FA (0)" for i in range(n)],
+        "POS": pos,
+        "My Ranking": np.arange(1, n + 1),
+    })
+
+
+def legacy_add_pos_rank(df):
+    pos_ranks = []
+    for i, row in df.iterrows():
+        pos = row["POS"]
+        my_rank = row["My Ranking"]
+        y = (df[(df["POS"] == pos) & (df["My Ranking"] < my_rank)]).shape[0] + 1
+        pos_ranks.append(f"{pos}{y}")
+    df["POS Rank"] = pos_ranks
+    return df
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'rows':>8} {'legacy':>12} {'vectorized':>12} {'move_player':>12}")
+    for n in SIZES:
+        df = make_frame(n)
+        legacy = timeit(lambda: legacy_add_pos_rank(df.copy()), 1) if n <= LEGACY_MAX_ROWS else None
+        vectorized = timeit(lambda: add_pos_rank(df.copy()), 5)
+        ranked = add_pos_rank(df.copy())
+        # A typical drag: a player moves ~20 spots up the board
+        src, dst = n // 2, n // 2 - 20
+        move = timeit(lambda: move_player(ranked, src, dst), 20)
+        legacy_s = f"{legacy * 1e3:10.1f}ms" if legacy is not None else f"{'skipped':>12}"
+        print(f"{n:>8} {legacy_s} {vectorized * 1e3:10.2f}ms {move * 1e3:10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark rebuilding a draft room from its event log.
+
+Logs a full draft (--teams x --rounds picks, with an undo / redo or an undo
+and a different pick every few picks), then times rebuilding the room from
+the database: from the latest snapshot plus the events after it, and from
+the whole log with no snapshot. Also times replaying the events in memory.
+
+Run from the repo root:  python benchmarks/bench_replay.py --teams 12 --rounds 18
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep benchmark drafts out of the real draft database
+os.environ.setdefault("FANTASY_DB", os.path.join(tempfile.mkdtemp(), "bench_replay.sqlite3"))
+import db  # noqa: E402
+import draft_store  # noqa: E402
+from draft_room import DraftRoom, replay  # noqa: E402
+
+ROOM = "replay-bench"
+
+
+def log_draft(picks):
+    room = DraftRoom(ROOM)
+    room.reset()
+    player = 0
+    while len(room.picks) < picks:
+        room.pick(player)
+        player += 1
+        if player % 7 == 0:
+            room.undo()
+            room.redo()
+        elif player % 11 == 0:
+            # Mis-click: take it back and pick someone else
+            room.undo()
+    draft_store.flush()
+    return room
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=18)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    room = log_draft(args.teams * args.rounds)
+    _, events = draft_store.load_log(ROOM)
+    print(f"draft: {len(room.picks)} picks, {room.seq} events, {len(events)} after the latest snapshot")
+    assert DraftRoom(ROOM).picks == room.picks
+
+    print(f"rebuild from snapshot + tail    {best_ms(lambda: DraftRoom(ROOM), args.repeat):8.3f}ms")
+    db.execute("DELETE FROM draft_snapshots WHERE draft_id = ?", (ROOM,))
+    _, events = draft_store.load_log(ROOM)
+    print(f"rebuild from the full log       {best_ms(lambda: DraftRoom(ROOM), args.repeat):8.3f}ms")
+    print(f"replay {len(events)} events in memory    {best_ms(lambda: replay([], [], events), args.repeat):8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
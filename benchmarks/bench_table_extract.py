@@ -0,0 +1,67 @@
+"""Benchmark ADP page parsing: BeautifulSoup + html.parser vs table_extract.
+
+Uses the HTML fixtures in fixtures/adp. Run from the repo root:
+    python benchmarks/bench_table_extract.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import table_extract  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "fixtures", "adp")
+
+
+def legacy_parse(html):
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", {"id": "data"})
+    if not table:
+        return pd.DataFrame()
+    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
+    rows = []
+    for tr in table.find("tbody").find_all("tr"):
+        cells = [td.text.strip() for td in tr.find_all("td")]
+        if cells:
+            rows.append(cells)
+    return pd.DataFrame(rows, columns=headers)
+
+
+def streaming_parse(html):
+    fragment = table_extract._table_slice(html, "data")
+    return table_extract._extract_stream(fragment, "data")
+
+
+def timeit(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parsers = [("bs4/html.parser", legacy_parse), ("streaming", streaming_parse)]
+    if table_extract.lxml is not None:
+        parsers.append(("lxml", table_extract.extract_table))
+    print(f"{'fixture':<28}" + "".join(f"{name:>18}" for name, _ in parsers))
+    for fname in sorted(os.listdir(FIXTURES)):
+        if not fname.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES, fname), encoding="utf-8") as f:
+            html = f.read()
+        expected = legacy_parse(html)
+        cells = []
+        for name, parse in parsers:
+            assert parse(html).equals(expected), f"{name} disagrees with bs4 on {fname}"
+            cells.append(f"{timeit(lambda: parse(html)) * 1e3:16.2f}ms")
+        print(f"{fname:<28}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Load test for many draft rooms picking at once.
+
+Serves the app on a local threaded server against the recorded ADP fixtures
+and runs one client per room, each making --picks picks through
+/api/draft/pick, --interval seconds apart (default: back to back). Every room drafts the same players, so
+rooms only interfere through shared locks. Reports pick latency p50/p99
+across all rooms.
+
+--direct calls DraftRoom.pick in the client threads instead of going over
+HTTP, isolating room locking and persistence from request handling.
+
+Run from the repo root:  python benchmarks/load_rooms.py --rooms 200 --picks 20
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="ff-rooms-")
+# Set before the app modules read them at import
+os.environ["ADP_CACHE_DIR"] = os.path.join(WORKDIR, "adp_cache")
+os.environ["FANTASY_DB"] = os.path.join(WORKDIR, "load_rooms.sqlite3")
+os.environ["RANKINGS_SNAPSHOT_DIR"] = os.path.join(WORKDIR, "snapshots")
+os.environ.setdefault("ADP_FIXTURES_DIR", os.path.join(ROOT, "fixtures", "adp"))
+sys.path.insert(0, ROOT)
+
+import draft  # noqa: E402
+import rankings  # noqa: E402
+from draft_room import get_room  # noqa: E402
+from draggable_rankings_app import app  # noqa: E402
+
+PLATFORM = "sleeper"
+
+
+def http_client(base_url, room_id, player_ids, interval, latencies, start):
+    session = requests.Session()
+    start.wait()
+    time.sleep(random.uniform(0, interval))  # rooms don't all pick in lockstep
+    for idx in player_ids:
+        t0 = time.perf_counter()
+        resp = session.post(f"{base_url}/api/draft/pick", json={"room": room_id, "idx": idx, "platform": PLATFORM})
+        latencies.append(time.perf_counter() - t0)
+        resp.raise_for_status()
+        time.sleep(interval)
+
+
+def direct_client(room_id, player_ids, interval, latencies, start):
+    room = get_room(room_id)
+    start.wait()
+    time.sleep(random.uniform(0, interval))
+    for idx in player_ids:
+        t0 = time.perf_counter()
+        room.pick(idx)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--picks", type=int, default=20, help="picks per room")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between a room's picks")
+    parser.add_argument("--direct", action="store_true", help="call DraftRoom.pick instead of the HTTP API")
+    args = parser.parse_args()
+
+    os.chdir(WORKDIR)  # nothing should land in the repo
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    player_ids = draft._get_rankings_cached((PLATFORM, rankings.DEFAULT_PROFILE)).index[:args.picks].tolist()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    server.socket.listen(args.rooms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    latencies = []
+    start = threading.Event()
+    threads = []
+    for n in range(args.rooms):
+        room_id = f"load-{n}"
+        target, targs = (direct_client, (room_id,)) if args.direct else (http_client, (base_url, room_id))
+        threads.append(threading.Thread(target=target, args=targs + (player_ids, args.interval, latencies, start), daemon=True))
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    t0 = time.perf_counter()
+    start.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+
+    latencies.sort()
+    n = len(latencies)
+    mode = "direct" if args.direct else "http"
+    print(f"{mode}: rooms={args.rooms} picks/room={args.picks} picks={n} in {elapsed:.2f}s ({n / elapsed:.0f} picks/s)")
+    if n:
+        print(
+            f"pick latency ms: p50={statistics.median(latencies) * 1e3:.2f} "
+            f"p99={latencies[min(n - 1, int(n * 0.99))] * 1e3:.2f} max={latencies[-1] * 1e3:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load test for draft-room SSE fan-out.
+
+Starts the draft routes on a local threaded server, subscribes N watchers to
+one room's /api/draft/stream and publishes picks into the room. Reports the
+publish -> receive latency across all watchers.
+
+Run from the repo root:  python benchmarks/load_sse.py --watchers 50 --picks 100
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from flask import Flask
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep load-test picks out of the real draft database
+os.environ.setdefault("FANTASY_DB", os.path.join(tempfile.mkdtemp(), "load_sse.sqlite3"))
+from draft import draft_route  # noqa: E402
+from draft_room import get_room  # noqa: E402
+
+ROOM = "sse-load-test"
+
+
+def watcher(base_url, expected, latencies, ready):
+    with requests.get(f"{base_url}/api/draft/stream?room={ROOM}", stream=True, timeout=30) as resp:
+        ready.release()
+        seen = 0
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            data = json.loads(line[len("data: "):])
+            latencies.append(time.time() - data["ts"])
+            seen += 1
+            if seen >= expected:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watchers", type=int, default=50)
+    parser.add_argument("--picks", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between picks")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app = Flask(__name__)
+    app.secret_key = "load-test"
+    draft_route(app)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    latencies = []
+    ready = threading.Semaphore(0)
+    threads = [
+        threading.Thread(target=watcher, args=(base_url, args.picks, latencies, ready), daemon=True)
+        for _ in range(args.watchers)
+    ]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        ready.acquire()
+    time.sleep(0.2)  # let every stream reach its first wait
+
+    room = get_room(ROOM)
+    t0 = time.perf_counter()
+    for idx in range(args.picks):
+        room.pick(idx)
+        time.sleep(args.interval)
+    for t in threads:
+        t.join(timeout=30)
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+
+    latencies.sort()
+    n = len(latencies)
+    expected = args.watchers * args.picks
+    print(f"watchers={args.watchers} picks={args.picks} events delivered={n}/{expected} in {elapsed:.2f}s")
+    if n:
+        print(
+            f"fan-out latency ms: p50={statistics.median(latencies) * 1e3:.2f} "
+            f"p99={latencies[min(n - 1, int(n * 0.99))] * 1e3:.2f} max={latencies[-1] * 1e3:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
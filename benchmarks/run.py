@@ -0,0 +1,189 @@
+"""Benchmark suite with stored baselines: fails when a case regresses.
+
+Everything runs offline against ADP pages served from disk (fetch's fixture
+mode): the recorded fixtures in fixtures/adp, then synthetic pages scaled up
+with benchmarks/synthetic.py. State (SQLite, ADP snapshots)
+lives in a throwaway directory.
+
+Absolute times from the machine that recorded the baselines mean nothing on
+another one, so each of a case's --repeat runs is paired with a calibration
+run (a fixed Python / pandas workload timed right before it) and the case
+reports the median run / calibration ratio. benchmarks/baselines.json holds
+those ratios; a case above baseline * (1 + tolerance) (plus NOISE_FLOOR) is
+a regression and the exit status is 1.
+
+Run from the repo root:
+    python benchmarks/run.py                      # compare with the baselines
+    python benchmarks/run.py --update             # record new baselines
+    python benchmarks/run.py --sizes 3000 --case load_rankings
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="ff-bench-")
+# Set before the app modules read them at import
+os.environ["ADP_CACHE_DIR"] = os.path.join(WORKDIR, "adp_cache")
+os.environ["FANTASY_DB"] = os.path.join(WORKDIR, "bench.sqlite3")
+os.environ["RANKINGS_SNAPSHOT_DIR"] = os.path.join(WORKDIR, "snapshots")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adp_cache  # noqa: E402
+import adp_sources  # noqa: E402
+import draft  # noqa: E402
+import fetch  # noqa: E402
+import rankings  # noqa: E402
+import synthetic  # noqa: E402
+import utils  # noqa: E402
+from draggable_rankings_app import app  # noqa: E402
+
+BASELINES = os.path.join(ROOT, "benchmarks", "baselines.json")
+FIXTURES = os.path.join(ROOT, "fixtures", "adp")
+SIZES = ["fixtures", "3000", "30000"]
+TOLERANCE = 0.5      # allowed slowdown over the baseline, as a fraction
+NOISE_FLOOR = 0.002  # seconds; sub-millisecond cases jitter more than any threshold
+PLATFORM = "sleeper"
+PROFILE = "bench"  # a second ranking profile, for switching
+TABLE_COLS = ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff"]
+
+
+def use_pages(directory):
+    """Serve ``directory`` as the ADP site and drop everything cached from the previous one."""
+    fetch.FIXTURES_DIR = directory
+    adp_cache.invalidate()
+    shutil.rmtree(adp_cache.ADP_CACHE_DIR, ignore_errors=True)
+    adp_sources._wide_cache.clear()
+    utils._rankings_cache.clear()
+    draft.invalidate_rankings_cache()
+    # Cold run outside the timings: resolves every new name to a player id once
+    utils.load_rankings(PLATFORM)
+
+
+def cases(directory, client):
+    with open(fetch.fixture_path("overall.php", directory), encoding="utf-8") as f:
+        page = f.read()
+    ranked = utils.add_diff(utils.load_rankings(PLATFORM))
+    rankings.replace_order(ranked["player_id"].to_numpy()[::-1], PROFILE)
+
+    def join_adp_data():
+        adp_sources._wide_cache.clear()
+        utils.join_adp_data(PLATFORM)
+
+    def load_rankings():
+        utils._rankings_cache.clear()
+        utils.load_rankings(PLATFORM)
+
+    def switch_profile():
+        utils.load_rankings(PLATFORM, PROFILE)
+        utils.load_rankings(PLATFORM)
+
+    def get(url):
+        def request():
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            response.get_data()
+        return request
+
+    return {
+        "parse": lambda: adp_sources.parse_adp_table(page),
+        "join_adp_data": join_adp_data,
+        "load_rankings": load_rankings,
+        "switch_profile": switch_profile,
+        "add_pos_rank": lambda: utils.add_pos_rank(ranked.copy()),
+        "add_diff": lambda: utils.add_diff(ranked.copy()),
+        "make_table_html": lambda: utils.make_table_html(ranked, TABLE_COLS, table_id="rankings-table", color_diff=True),
+        "GET /": get("/"),
+        "GET /draft": get(f"/draft?platform={PLATFORM}"),
+    }
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def measure(fn, repeat):
+    """Median seconds, median seconds per calibration run, and the calibration's median seconds."""
+    # Interleaved, so a run and its calibration see the same machine speed
+    times, units = [], []
+    for _ in range(repeat):
+        units.append(timed(calibration))
+        times.append(timed(fn))
+    unit = statistics.median(units)
+    return statistics.median(times), statistics.median(t / u for t, u in zip(times, units)), unit
+
+
+def calibration():
+    # The unit every case is measured in: a fixed mix of interpreter, string
+    # and pandas work, about what the cases do, and no app code
+    ids = np.arange(20000)
+    frame = pd.DataFrame({"pos": ids % 7, "name": [f"Player {i}" for i in ids]})
+    frame.groupby("pos")["name"].count()
+    "".join("<td>" + frame["name"] + "</td>")
+    sorted(frame["name"].tolist(), key=str.lower)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=SIZES, help="'fixtures' and/or synthetic player counts")
+    parser.add_argument("--case", action="append", help="only these cases (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, as a fraction")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baselines")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES, encoding="utf-8") as f:
+            baselines = json.load(f)
+    os.chdir(WORKDIR)  # nothing should land in the repo
+    client = app.test_client()
+    results, regressions = {}, []
+    print(f"{'case':<32}{'time':>12}{'units':>10}{'baseline':>10}{'change':>10}")
+    try:
+        for size in args.sizes:
+            directory = FIXTURES if size == "fixtures" else synthetic.write_pages(os.path.join(WORKDIR, f"pages-{size}"), int(size))
+            use_pages(directory)
+            for name, fn in cases(directory, client).items():
+                if args.case and name not in args.case:
+                    continue
+                key = f"{size}/{name}"
+                seconds, units, unit = measure(fn, args.repeat)
+                results[key] = units
+                base = baselines.get(key)
+                if base is None:
+                    print(f"{key:<32}{seconds * 1e3:10.2f}ms{units:10.3f}{'-':>10}")
+                    continue
+                flag = ""
+                if units > base * (1 + args.tolerance) + NOISE_FLOOR / unit:
+                    regressions.append(key)
+                    flag = "  REGRESSION"
+                print(f"{key:<32}{seconds * 1e3:10.2f}ms{units:10.3f}{base:10.3f}{(units / base - 1) * 100:+9.0f}%{flag}")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.update:
+        baselines.update({k: round(v, 4) for k, v in results.items()})
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+        print(f"baselines written to {os.path.relpath(BASELINES, ROOT)}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Synthetic FantasyPros ADP pages at any player count.
+
+Pages use the live markup (page chrome around one ``<table id="data">``, the
+same cells as the recorded fixtures in fixtures/adp), so they go through the
+real fetch / parse / id-resolution path in offline mode. Output is fully
+determined by ``players`` and ``seed``.
+
+Run from the repo root:  python benchmarks/synthetic.py /tmp/adp-20k --players 20000
+then point the app at it:  ADP_FIXTURES_DIR=/tmp/adp-20k python draggable_rankings_app.py
+"""
+import argparse
+import os
+
+import numpy as np
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DST"]
+POSITION_SHARE = [0.12, 0.27, 0.35, 0.14, 0.06, 0.06]
+TEAMS = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC",
+         "LAC", "LAR", "LV", "MIA", "MIN", "NE", "NO", "NYG", "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS"]
+FIRST = ["Travis", "CeeDee", "Jalen", "Xavier", "Jahmyr", "Saquon", "Marvin", "Drake", "Davante", "Tony",
+         "Kenneth", "Garrett", "Lamar", "Jaylen", "Bijan", "Malik", "Justin", "Tee", "Amon", "Puka"]
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ha", "je", "ki", "lo", "mu", "na", "pe", "ri", "so", "tu", "va",
+             "we", "xi", "yo", "za", "bro", "cla", "dre", "fli", "gro", "pra", "str", "tho", "vin", "wel"]
+PAGES = {
+    "overall": ["ESPN", "Sleeper", "CBS", "NFL", "RTSports", "Fantrax"],
+    "best-ball-overall": ["Underdog", "Drafters", "RTSports"],
+}
+BEST_BALL_SHARE = 0.94  # best-ball pages list slightly fewer players
+
+
+def _surname(i):
+    # Distinct, pronounceable surnames: base-30 digits of i as syllables
+    parts = []
+    i += len(SYLLABLES)  # at least two syllables
+    while i:
+        i, d = divmod(i, len(SYLLABLES))
+        parts.append(SYLLABLES[d])
+    return "".join(parts).capitalize()
+
+
+def players(n, seed=0):
+    """``(names, teams, byes, positions, consensus ADP)`` for ``n`` players in ADP order."""
+    rng = np.random.default_rng(seed)
+    names = [f"{FIRST[i % len(FIRST)]} {_surname(i)}" for i in range(n)]
+    teams = rng.integers(len(TEAMS), size=n)
+    byes = rng.integers(5, 15, size=n)
+    positions = rng.choice(POSITIONS, size=n, p=POSITION_SHARE)
+    adp = np.sort(np.arange(1, n + 1) + rng.normal(0, 0.5, n).cumsum() * 0.05)
+    return names, [TEAMS[t] for t in teams], byes, positions, np.maximum(1.0, adp)
+
+
+def adp_page(n, platforms, seed=0, title="Overall ADP Rankings", listed=None):
+    """HTML for one ADP page of ``n`` players, listing the first ``listed`` (default all), a column per platform."""
+    names, teams, byes, positions, adp = players(n, seed)
+    n = n if listed is None else min(n, listed)
+    adp = adp[:n]
+    rng = np.random.default_rng(seed + 1)
+    noise = rng.normal(0, 1, (n, len(platforms))) * np.maximum(1.0, 0.1 * adp)[:, None]
+    by_platform = np.round(np.maximum(1.0, adp[:, None] + noise), 1)
+    pos_rank = {}
+    head = "".join(f"<th>{h}</th>" for h in ["Rank", "Player Team (Bye)", "POS", *platforms, "AVG"])
+    rows = []
+    for i in range(n):
+        pos = positions[i]
+        pos_rank[pos] = pos_rank.get(pos, 0) + 1
+        label = (f'<a href="/nfl/players/p{i}.php" class="player-name">{names[i]}</a> '
+                 f'<small class="grey">{teams[i]}</small> <small class="grey">({byes[i]})</small>'
+                 f'<a href="#" class="fp-player-link fp-id-{10000 + i}" fp-player-name="{names[i]}"></a>')
+        cells = "".join(f"<td>{v:.1f}</td>" for v in by_platform[i])
+        rows.append(f'<tr class="player-row"><td>{i + 1}</td><td class="player-label">{label}</td>'
+                    f"<td>{pos}{pos_rank[pos]}</td>{cells}<td>{i + 1:.1f}</td></tr>")
+    menu = "".join(f'<li><a href="/nfl/page{i}.php">Menu item {i}</a></li>' for i in range(250))
+    return (
+        f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"><title>{title}</title></head><body>'
+        f'<nav><ul>{menu}</ul></nav><div class="mobile-table">'
+        f'<table id="data" class="table table-striped table-bordered"><thead><tr>{head}</tr></thead>\n<tbody>\n'
+        + "\n".join(rows)
+        + f"\n</tbody></table></div><footer><nav><ul>{menu}</ul></nav></footer></body></html>\n"
+    )
+
+
+def write_pages(directory, n, seed=0):
+    """Write every registered source page for ``n`` players as ``<directory>/<name>.html``."""
+    os.makedirs(directory, exist_ok=True)
+    listed = {"overall": n, "best-ball-overall": int(n * BEST_BALL_SHARE)}
+    for name, platforms in PAGES.items():
+        with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(adp_page(n, platforms, seed, listed=listed[name]))
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_pages(args.directory, args.players, args.seed)
+    print(f"wrote {args.players} players to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
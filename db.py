@@ -0,0 +1,74 @@
+import itertools
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# One SQLite file for server-side state (player ids, draft picks). A single
+# shared connection in WAL mode; writers serialize on the module lock.
+DB_PATH = os.environ.get("FANTASY_DB", "fantasy.sqlite3")
+
+_conn = None
+lock = threading.RLock()
+
+
+def connect():
+    global _conn
+    if _conn is None:
+        with lock:
+            if _conn is None:
+                conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                _conn = conn
+    return _conn
+
+
+def execute(sql, params=()):
+    with lock:
+        return connect().execute(sql, params)
+
+
+def executemany(sql, rows):
+    with lock:
+        conn = connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def executebatch(statements):
+    """Run ``[(sql, params), ...]`` in one transaction, runs of the same sql as one executemany."""
+    with lock:
+        conn = connect()
+        conn.execute("BEGIN")
+        try:
+            for sql, run in itertools.groupby(statements, key=lambda statement: statement[0]):
+                conn.executemany(sql, [params for _, params in run])
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+@contextmanager
+def transaction():
+    """Yield the connection inside ``BEGIN IMMEDIATE``: holds the write lock, across processes too."""
+    with lock:
+        conn = connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def query(sql, params=()):
+    with lock:
+        return connect().execute(sql, params).fetchall()
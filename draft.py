@@ -1,152 +1,485 @@
-from flask import request, session, redirect, url_for
-from utils import load_rankings, add_diff, add_pos_rank
+from flask import Response, abort, jsonify, request, session, redirect, url_for
+from utils import load_rankings, add_diff, add_pos_rank, add_trend, rankings_version
+from render import cached_rows, cell_text, diff_colors, iter_table, render_rows, td, trend_text
+from draft_room import DEFAULT_SETTINGS, get_room
+from rankings import DEFAULT_PROFILE, profile_key, profiles, version as profile_rev
+from adp_sources import platforms
+from search_index import get_index
+from availability import next_pick_availability, picks_before_next
+from vor import DEFAULT_LINEUP, LeagueSettings, ValueBoard, rank_scores
+from draft_plan import PLAN_TARGETS, my_pick_numbers, plan
+import http_cache
+import metrics
+from http_cache import asset_url
+import shared_snapshot
+import pandas as pd
+import html
+import itertools
+import re
+import json
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-# Small in-process cache to avoid recomputing rankings every request
-_CACHE_TTL = 30  # seconds
-_df_cache = {}   # { platform: {"df": DataFrame, "ts": float} }
+# In-process rankings cache, served stale-while-revalidate: a frame older than
+# _CACHE_TTL is returned as is while one background worker rebuilds it, so
+# only a cold cache, one past _CACHE_MAX_STALE or an invalidated one makes a
+# request wait. Frames are kept per view, a (platform, ranking profile) pair,
+# so switching profiles is a lookup. Rebuilds are single-flight per view, and with pyarrow
+# installed also across worker processes: the rebuilt frame is published via
+# shared_snapshot and the other workers memory-map it instead of building
+# their own. Frames carry the rev of the saved order they were built from
+# (stored with the order, so the same in every process): a frame whose rev is
+# not the stored one is neither served nor adopted, so an order changed by
+# another worker is picked up on the next request.
+_CACHE_TTL = 30         # seconds before a background refresh is started
+_CACHE_MAX_STALE = 300  # seconds after which requests wait for a fresh frame
+_df_cache = {}   # { view: {"df": DataFrame, "ts": float, "version": int, "rev": int, "index": SearchIndex} }
+_versions = itertools.count(1)
+_invalidated_at = {}  # { view: float } set by invalidate_rankings_cache
+_refresh_locks = {}   # { view: Lock }
+_locks_guard = threading.Lock()
+# Own pool: a rebuild waits on the ADP fetch pool, so it must not run inside it
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rankings-refresh")
+_value_boards = {}  # { (room id, frame version, LeagueSettings): [Lock, ValueBoard] }, oldest first
+_value_lock = threading.Lock()
+_VALUE_BOARDS_MAX = 64
+_live_rows = {}  # { (room id, view): (draft state key, {player id: "<tr>...</tr>"}) }, oldest first
+_LIVE_ROWS_MAX = 16
+# Boards longer than this are streamed to the browser in row batches
+_STREAM_MIN_ROWS = 500
+# Room ids come from links and go into pages, the session and the database
+_ROOM_ID = re.compile(r"[A-Za-z0-9_-]{1,32}")
 
-def _get_rankings_cached(platform: str):
-    now = time.time()
-    entry = _df_cache.get(platform)
-    if entry and (now - entry["ts"] < _CACHE_TTL):
-        # Return a shallow copy so filters don’t mutate cache
-        return entry["df"].copy(deep=False)
-    df = load_rankings(platform)
+metrics.describe("rankings_cache_requests_total", "counter",
+                 "Draft rankings cache lookups: hit, stale (served while refreshing), shared "
+                 "(adopted from another worker) or miss.")
+
+def _view_name(view):
+    # File / fragment / label name of a view, e.g. "sleeper.best-ball"
+    return "{}.{}".format(*view)
+
+@metrics.timed("rankings_build")
+def _build_rankings(view):
+    platform, profile = view
+    ts = time.time()
+    index_version = rankings_version(platform, profile)
+    rev = index_version[3]
+    df = load_rankings(platform, profile)
     # Compute once; these are stable for a given platform/order
     df = add_diff(df)
     df = add_pos_rank(df)
-    # Precompute lowercase name key for fast, case-insensitive search
-    if "name_key" not in df.columns:
-        df["name_key"] = df["Player Team (Bye)"].astype(str).str.lower()
-    _df_cache[platform] = {"df": df, "ts": now}
-    return df.copy(deep=False)
-
-# Gradient color for Diff like on My Rankings (max magnitude = 10)
-def _diff_bg_color(diff, max_diff=10):
-    # NaN-safe
-    try:
-        if diff != diff:
-            return "#fff"
-    except Exception:
-        return "#fff"
-    # Clamp
-    norm = max(-max_diff, min(max_diff, float(diff)))
-    if norm < 0:
-        pct = abs(norm) / max_diff
-        r = round(255 - 155 * pct)
-        g = 255
-        b = round(255 - 155 * pct)
-        return f"rgb({r},{g},{b})"
-    elif norm > 0:
-        pct = norm / max_diff
-        r = 255
-        g = round(255 - 155 * pct)
-        b = round(255 - 155 * pct)
-        return f"rgb({r},{g},{b})"
-    return "#fff"
-
-def _render_board_table(board_df, pos_filter: str, q: str):
-    cols = ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff", "Action"]
+    df = add_trend(df, platform)
+    # Rows are indexed by stable player id: picks, row fragments and the
+    # page's data-idx all survive a rebuild with new ADP or a new order
+    df = df.set_index("player_id")
+    df = df[~df.index.duplicated()]
+    # A rebuild that started before an invalidation must not replace it
+    if ts < _invalidated_at.get(view, 0):
+        return {"df": df, "ts": ts, "version": -next(_versions), "rev": rev, "index": get_index(view, index_version, df)}
+    version = next(_versions)
+    if shared_snapshot.enabled():
+        try:
+            version = shared_snapshot.publish(_view_name(view), df, ts, rev)
+        except OSError:
+            # Unshared, so negative: it can't collide with a published version
+            version = -version
+    # The search index only changes with the ADP snapshot or the saved order
+    entry = {"df": df, "ts": ts, "version": version, "rev": rev, "index": get_index(view, index_version, df)}
+    _df_cache[view] = entry
+    return entry
+
+def _adopt_shared(view, max_age: float):
+    # A newer frame published by another worker, mapped instead of rebuilt
+    if not shared_snapshot.enabled():
+        return None
+    version, published, rev = shared_snapshot.current_version(_view_name(view))
+    entry = _df_cache.get(view)
+    if not version or (entry and entry["version"] == version):
+        return None
+    # Published from an order that has changed since (or not yet caught up with here)
+    if rev != profile_rev(view[1]):
+        return None
+    if time.time() - published >= max_age or published < _invalidated_at.get(view, 0):
+        return None
+    df = shared_snapshot.load(_view_name(view), version)
+    if df is None:
+        return None
+    entry = {"df": df, "ts": published, "version": version, "rev": rev, "index": get_index(view, ("shared", version), df)}
+    _df_cache[view] = entry
+    return entry
+
+def _refresh_lock(view):
+    lock = _refresh_locks.get(view)
+    if lock is None:
+        with _locks_guard:
+            lock = _refresh_locks.setdefault(view, threading.Lock())
+    return lock
+
+def _refresh(view, max_age: float):
+    # Single flight: callers queue on the lock and reuse what the first one built
+    with _refresh_lock(view):
+        entry = _df_cache.get(view)
+        if entry and entry["rev"] == profile_rev(view[1]) and time.time() - entry["ts"] < max_age:
+            return entry
+        with shared_snapshot.build_lock(_view_name(view)):
+            return _adopt_shared(view, max_age) or _build_rankings(view)
+
+def _refresh_in_background(view):
+    if _refresh_lock(view).locked():
+        return  # a rebuild is already in flight
+    # A failed refresh leaves the stale frame in place; the next request retries
+    _refresher.submit(_refresh, view, _CACHE_TTL)
+
+def _get_rankings_cached(view):
+    # Checking for another worker's frame is one read of a tiny version file
+    shared = _adopt_shared(view, _CACHE_MAX_STALE)
+    entry = shared or _df_cache.get(view)
+    age = time.time() - entry["ts"] if entry else None
+    platform, profile = view
+    # A rev other than the stored one: the order was changed, maybe by another worker
+    if entry is None or age >= _CACHE_MAX_STALE or entry["rev"] != profile_rev(profile):
+        metrics.inc("rankings_cache_requests_total", platform=platform, profile=profile, result="miss")
+        entry = _refresh(view, _CACHE_MAX_STALE)
+    elif age >= _CACHE_TTL:
+        metrics.inc("rankings_cache_requests_total", platform=platform, profile=profile, result="stale")
+        _refresh_in_background(view)
+    else:
+        metrics.inc("rankings_cache_requests_total", platform=platform, profile=profile,
+                    result="shared" if shared else "hit")
+    # Return a shallow copy so filters don’t mutate cache
+    return entry["df"].copy(deep=False)
+
+def invalidate_rankings_cache(profile=None):
+    """Drop cached frames (of every profile by default) after a saved order changes.
+
+    The next request rebuilds synchronously; a refresh already running for
+    the old order is discarded.
+    """
+    now = time.time()
+    for view in list(_df_cache):
+        if profile is not None and view[1] != profile:
+            continue
+        _invalidated_at[view] = now
+        # Keep the entry for _search_index, but make it too stale to serve
+        _df_cache[view] = dict(_df_cache[view], ts=float("-inf"))
+
+def _search_index(view):
+    # Always called after _get_rankings_cached for the same view
+    return _df_cache[view]["index"]
+
+def _rankings_version(view):
+    # Bumped whenever the cached frame is rebuilt; rendered rows are keyed on it
+    entry = _df_cache.get(view)
+    return (view, entry["version"]) if entry else None
+
+_BOARD_COLS = ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff", "Trend", "Action"]
+# Columns that move with every pick: (frame column, header, cell class)
+_LIVE_COLS = [("VOR", "VOR", "vor"), ("Avail", "Avail @ Next Pick", "avail")]
+_DRAFTED_COLS = ["Draft Position", "My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP"]
+
+def _render_board_head(board_df):
+    # <tr> and the cells that only change with the rankings, left open for _board_tail
+    idx = board_df.index.astype(str).to_series(index=board_df.index)
+    attrs = " data-idx='" + idx + "' data-rank='" + cell_text(board_df["My Ranking"]) + "'"
+    return render_rows(board_df, [
+        td(cell_text(board_df["My Ranking"])),
+        td(cell_text(board_df["Player Team (Bye)"])),
+        td(cell_text(board_df["POS"])),
+        td(cell_text(board_df["POS Rank"])),
+        td(cell_text(board_df["ADP"])),
+        # Gradient color for Diff like on My Rankings (max magnitude = 10)
+        td(cell_text(board_df["Diff"], blank_nan=True), "background:" + diff_colors(board_df["Diff"], 10) + ";"),
+        td(trend_text(board_df["Trend"])),
+    ], attrs=attrs, close=False)
+
+def _board_tail(board_df, live_df):
+    # The per-pick cells (VOR / Avail), the Mark Drafted button and </tr>
+    live_df = live_df.reindex(board_df.index)
+    live = [
+        [f"<td class='{css}'>{text}</td>" for text in _LIVE_TEXT[col](live_df[col]).tolist()]
+        for col, _, css in _LIVE_COLS if col in live_df.columns
+    ]
+    return [
+        "".join(cells) + "<td>"
+        "<form method='POST' style='margin:0;'>"
+        f"<input type='hidden' name='drafted_idx' value='{idx}'/>"
+        "<button class='btn btn-primary' type='submit'>Mark Drafted</button>"
+        "</form>"
+        "</td></tr>"
+        for idx, *cells in zip(board_df.index.tolist(), *live)
+    ]
+
+def _avail_text(prob):
+    pct = (prob * 100).round()
+    return (pct.fillna(0).astype(int).astype(str) + "%").where(prob.notna(), "")
+
+def _vor_text(value):
+    # Scores run 0-1 from the top pick down; show VOR on a 0-100 scale
+    return (value * 100).map("{:.1f}".format).where(value.notna(), "")
+
+_LIVE_TEXT = {"VOR": _vor_text, "Avail": _avail_text}
+
+def _render_drafted_rows(drafted_df):
+    attrs = " data-idx='" + drafted_df.index.astype(str).to_series(index=drafted_df.index) + "'"
+    return render_rows(drafted_df, [
+        td(drafted_df["Draft Position"].astype(int).astype(str)),
+        td(cell_text(drafted_df["My Ranking"])),
+        td(cell_text(drafted_df["Player Team (Bye)"])),
+        td(cell_text(drafted_df["POS"])),
+        td(cell_text(drafted_df["POS Rank"])),
+        td(cell_text(drafted_df["ADP"])),
+    ], attrs=attrs)
+
+def _table_parts(title, cols, rows, table_id, empty=None):
     th = "".join(f"<th>{c}</th>" for c in cols)
-    rows = []
-    for idx, row in board_df.iterrows():
-        diff_val = row["Diff"] if (row["Diff"] == row["Diff"]) else None
-        diff_bg = _diff_bg_color(diff_val) if diff_val is not None else "#fff"
-        tds = [
-            f"<td>{row['My Ranking']}</td>",
-            f"<td>{row['Player Team (Bye)']}</td>",
-            f"<td>{row['POS']}</td>",
-            f"<td>{row['POS Rank']}</td>",
-            f"<td>{row['ADP']}</td>",
-            f"<td style='background:{diff_bg};'>{'' if diff_val is None else diff_val}</td>",
-            (
-                "<td>"
-                "<form method='POST' style='margin:0;'>"
-                f"<input type='hidden' name='drafted_idx' value='{idx}'/>"
-                f"<input type='hidden' name='pos' value='{pos_filter or ''}'/>"
-                f"<input type='hidden' name='q' value='{q or ''}'/>"
-                "<button class='btn btn-primary' type='submit'>Mark Drafted</button>"
-                "</form>"
-                "</td>"
-            ),
-        ]
-        rows.append(f"<tr>{''.join(tds)}</tr>")
-    return (
+    # The empty message and table are both rendered so the page can switch
+    # between them in place as picks are made and undone
+    hidden = " style='display:none;'"
+    head = (
         "<div class='card'>"
-        "<h2>Draft Board</h2>"
-        "<table class='table'><thead><tr>" + th + "</tr></thead>"
-        "<tbody>" + "".join(rows) + "</tbody></table>"
-        "</div>"
+        f"<h2>{title}</h2>"
+        + (f"<div class='empty'{hidden if rows else ''}>{empty}</div>" if empty else "")
+        + f"<table class='table' id='{table_id}'{hidden if empty and not rows else ''}><thead><tr>" + th + "</tr></thead>"
+        "<tbody>"
     )
+    return head, rows, "</tbody></table></div>"
 
-def _render_drafted_table(drafted_df, drafted_order):
-    if drafted_df.empty:
-        return (
-            "<div class='card'>"
-            "<h2>Players Drafted</h2>"
-            "<div class='empty'>No players drafted yet.</div>"
-            "</div>"
-        )
+@metrics.timed("render")
+def _board_rows(board_df, view, version, live):
+    # Rows no longer carry the filters: the form posts back to the current URL,
+    # so a rendered row is the same for every filter. The rankings part is
+    # cached per frame for every room; whole rows are kept per room until its
+    # draft state moves on, when only the live cells are rendered again
+    key, live_df = live
+    with _value_lock:
+        entry = _live_rows.pop(key[:2], None)
+        if entry is None or entry[0] != key:
+            entry = (key, {})
+        _live_rows[key[:2]] = entry
+        while len(_live_rows) > _LIVE_ROWS_MAX:
+            del _live_rows[next(iter(_live_rows))]
+    cache = entry[1]
+    ids = board_df.index.tolist()
+    missing = [pid for pid in ids if pid not in cache]
+    if missing:
+        missing_df = board_df.loc[missing]
+        heads = cached_rows(f"board:{_view_name(view)}", version, missing_df, _render_board_head)
+        cache.update(zip(missing, [head + tail for head, tail in zip(heads, _board_tail(missing_df, live_df))]))
+    return [cache[pid] for pid in ids]
+
+def _board_table_parts(board_df, view, version, live):
+    rows = _board_rows(board_df, view, version, live)
+    live_headers = [header for col, header, _ in _LIVE_COLS if col in live[1].columns]
+    return _table_parts("Draft Board", _BOARD_COLS[:-1] + live_headers + _BOARD_COLS[-1:], rows, "board-table")
+
+@metrics.timed("render")
+def _drafted_rows(drafted_df, drafted_order, view, version):
     # Map index -> draft position by order clicked
     draft_pos_map = {idx: pos + 1 for pos, idx in enumerate(drafted_order)}
     drafted_df = drafted_df.copy()
     drafted_df["Draft Position"] = [draft_pos_map.get(ix, 0) for ix in drafted_df.index]
     # Show newest draftees first
     drafted_df.sort_values("Draft Position", ascending=False, inplace=True)
+    keys = list(zip(drafted_df.index, drafted_df["Draft Position"]))
+    return cached_rows(f"drafted:{_view_name(view)}", version, drafted_df, _render_drafted_rows, keys=keys)
 
+@metrics.timed("render")
+def _drafted_row(df, idx, drafted_order, view, pos_filter, q):
+    # The pick / redo API's one new row (None if the filters hide it), built
+    # straight from the player's row: no frame slicing or row cache for one <tr>
+    if idx not in df.index or idx not in drafted_order:
+        return None
+    if (pos_filter or q) and idx not in _search_index(view).lookup(q, pos_filter):
+        return None
+    row = df.loc[idx, _DRAFTED_COLS[1:]].tolist()
+    cells = "".join(f"<td>{value}</td>" for value in [drafted_order.index(idx) + 1] + row)
+    return f"<tr data-idx='{idx}'>{cells}</tr>"
+
+def _render_drafted_table(drafted_df, drafted_order, view, version):
     # Removed "Diff" column from the drafted table
-    cols = ["Draft Position", "My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP"]
-    th = "".join(f"<th>{c}</th>" for c in cols)
-    rows = []
-    for idx, row in drafted_df.iterrows():
-        tds = [
-            f"<td>{int(row['Draft Position'])}</td>",
-            f"<td>{row['My Ranking']}</td>",
-            f"<td>{row['Player Team (Bye)']}</td>",
-            f"<td>{row['POS']}</td>",
-            f"<td>{row['POS Rank']}</td>",
-            f"<td>{row['ADP']}</td>",
+    rows = _drafted_rows(drafted_df, drafted_order, view, version) if not drafted_df.empty else []
+    head, rows, tail = _table_parts("Players Drafted", _DRAFTED_COLS, rows, "drafted-table", empty="No players drafted yet.")
+    return head + "".join(rows) + tail
+
+def _filter_frame(df, pos_filter, q, index):
+    # POS filter and case-insensitive name search, answered by the search index
+    if not (pos_filter or q) or df.empty:
+        return df
+    return df[df.index.isin(index.lookup(q, pos_filter))]
+
+def _current_room():
+    # A ?room= link joins that room; otherwise each browser gets its own
+    room_id = request.args.get('room') or (request.get_json(silent=True) or {}).get('room')
+    if room_id:
+        if not isinstance(room_id, str) or not _ROOM_ID.fullmatch(room_id):
+            abort(400, "invalid room id")
+        session['draft_room'] = room_id
+    else:
+        room_id = session.get('draft_room')
+        if not room_id or not _ROOM_ID.fullmatch(room_id):
+            room_id = session['draft_room'] = uuid.uuid4().hex[:10]
+    return get_room(room_id)
+
+def current_profile():
+    """Saved ranking profile this browser uses; ?profile= (or a JSON "profile") switches to another saved one.
+
+    Unknown names are ignored rather than creating a profile (or a cached
+    view of one): profiles are added explicitly, see /add_profile.
+    """
+    saved = profiles()
+    name = request.values.get('profile') or (request.get_json(silent=True) or {}).get('profile')
+    key = profile_key(name) if name else None
+    if key in saved:
+        session['rankings_profile'] = key
+    profile = session.get('rankings_profile')
+    # A profile deleted since it was chosen falls back to the default one
+    return profile if profile in saved else DEFAULT_PROFILE
+
+def checked_platform(platform):
+    # Only platforms in the ADP snapshot become a room setting or a cached view
+    # (anything else is a 400)
+    if platform not in platforms():
+        abort(400, "unknown platform")
+    return platform
+
+def _room_platform(room):
+    # Settings saved before platforms were checked may name one that doesn't exist
+    platform = room.settings['platform']
+    return platform if platform in platforms() else DEFAULT_SETTINGS['platform']
+
+def _checked_teams(teams):
+    if teams is not None and teams < 2:
+        abort(400, "invalid teams")
+    return teams
+
+def _checked_lineup(lineup, teams):
+    if lineup:
+        try:
+            LeagueSettings.parse(teams, lineup)
+        except ValueError:
+            abort(400, "invalid lineup")
+    return lineup or None
+
+def _league_settings():
+    # League size is the room's; my draft slot is remembered per browser (slot=0 turns it off)
+    room = _current_room()
+    room.configure(teams=_checked_teams(request.args.get('teams', type=int)))
+    slot = request.args.get('slot', type=int)
+    if slot is not None:
+        session['draft_slot'] = slot
+    teams = max(2, room.settings['teams'])
+    slot = session.get('draft_slot') or None
+    # Anything outside 1..teams (a stale slot after shrinking the league, a negative one) is off
+    return teams, slot if slot and 1 <= slot <= teams else None
+
+def _league():
+    # Starting lineup, e.g. "1QB,2RB,2WR,1TE,1FLEX,1K,1DST"; kept with the room like teams
+    teams, _ = _league_settings()
+    room = _current_room()
+    room.configure(lineup=_checked_lineup(request.args.get('lineup'), teams))
+    try:
+        return LeagueSettings.parse(teams, room.settings['lineup'] or DEFAULT_LINEUP)
+    except ValueError:
+        return LeagueSettings.parse(teams)
+
+def _availability(df, taken, drafted_order, view):
+    """P(available at my next pick) by player id, or None without a slot."""
+    teams, slot = _league_settings()
+    if slot is None:
+        return None
+    pool = df.loc[~taken]
+    picks = picks_before_next(len(drafted_order) + 1, teams, slot)
+    key = (_rankings_version(view), tuple(drafted_order), teams, slot)
+    prob = next_pick_availability(key, pool["ADP_num"].to_numpy(), picks)
+    return pd.Series(prob, index=pool.index)
+
+def _values(df, room, drafted_order, view, settings):
+    # One ValueBoard per room and frame, moved along pick by pick under its
+    # own lock; the shared lock only guards the (LRU) dict
+    key = (room.room_id, _rankings_version(view), settings)
+    with _value_lock:
+        entry = _value_boards.pop(key, None) or [threading.Lock(), None]
+        _value_boards[key] = entry
+        while len(_value_boards) > _VALUE_BOARDS_MAX:
+            del _value_boards[next(iter(_value_boards))]
+    with entry[0]:
+        if entry[1] is None:
+            scores = rank_scores(df["My Ranking"], settings.teams)
+            entry[1] = ValueBoard(df.index, df["POS"], scores, settings)
+        entry[1].sync(drafted_order)
+        return entry[1].series()
+
+@metrics.timed("live_columns")
+def _live_columns(df, room, drafted_order, view):
+    """``(draft state key, frame of per-pick board columns)``: VOR, plus availability with a slot set."""
+    settings = _league()
+    live = pd.DataFrame({"VOR": _values(df, room, drafted_order, view, settings)})
+    avail = _availability(df, room.taken_mask(df.index), drafted_order, view)
+    if avail is not None:
+        live["Avail"] = avail
+    key = (room.room_id, view, _rankings_version(view), tuple(drafted_order), settings, _league_settings()[1])
+    return key, live
+
+@metrics.timed("plan")
+def _draft_plan(df, room, drafted_order):
+    """Position per remaining pick of mine, with the likeliest good players; None without a slot."""
+    settings = _league()
+    _, slot = _league_settings()
+    if slot is None:
+        return None
+    # My roster so far: whoever went at my pick numbers
+    mine = set(my_pick_numbers(settings.teams, slot, settings.rounds))
+    roster = {}
+    for pick_no, pid in enumerate(drafted_order, start=1):
+        if pick_no in mine and pid in df.index:
+            pos = df.at[pid, "POS"]
+            roster[pos] = roster.get(pos, 0) + 1
+    pool = df.loc[~room.taken_mask(df.index)]
+    scores = 100 * rank_scores(pool["My Ranking"], settings.teams)
+    positions = pool["POS"].fillna("").to_numpy()
+    steps, avail = plan(positions, scores, pool["ADP_num"].to_numpy(), roster, settings,
+                        len(drafted_order) + 1, slot)
+    names = pool["Player Team (Bye)"].tolist()
+    ids = pool.index.tolist()
+    for j, step in enumerate(steps):
+        # Best expected score among the position's players, availability included
+        cols = (positions == step["pos"]).nonzero()[0]
+        expected = scores[cols] * avail[cols, j]
+        step["targets"] = [
+            {"idx": ids[c], "name": names[c], "avail": round(float(avail[c, j]), 2)}
+            for c in cols[(-expected).argsort(kind="stable")[:PLAN_TARGETS]]
         ]
-        rows.append(f"<tr>{''.join(tds)}</tr>")
-    return (
-        "<div class='card'>"
-        "<h2>Players Drafted</h2>"
-        "<table class='table'><thead><tr>" + th + "</tr></thead>"
-        "<tbody>" + "".join(rows) + "</tbody></table>"
-        "</div>"
-    )
+    return steps
 
-DRAFT_PAGE_CSS = """
-<style>
-  .container { max-width: 1200px; margin: 24px auto; padding: 0 16px; }
-  .header { position: relative; display:flex; align-items:center; justify-content:center; }
-  .end-draft { position:absolute; right:0; top:0; }
-  .btn { cursor:pointer; border:none; border-radius:8px; padding:8px 14px; }
-  .btn-primary { background:#1664d9; color:#fff; }
-  .btn-danger  { background:#e74c3c; color:#fff; }
-  .grid { display:flex; gap:16px; }
-  .card { flex:1; background:#fff; border-radius:12px; padding:16px; box-shadow:0 2px 10px rgba(0,0,0,0.06); min-width: 460px; }
-  .table { width:100%; border-collapse:collapse; }
-  .table th, .table td { padding:10px; border-bottom:1px solid #eaecef; text-align:left; }
-  .table thead th { background:#f4f6f8; }
-  .empty { color:#6b7280; font-style:italic; padding:8px 0; }
-  @media (max-width: 1100px) {
-    .grid { overflow-x:auto; }
-    .card { min-width:540px; }
-  }
-</style>
-"""
+def _api_args():
+    # (JSON body, view, pos filter, search)
+    data = request.get_json(silent=True) or {}
+    platform = data.get('platform') or request.args.get('platform')
+    platform = checked_platform(platform) if platform else _room_platform(_current_room())
+    pos_filter = data.get('pos', request.args.get('pos', '')) or ''
+    q = (data.get('q', request.args.get('q', '')) or '').strip()
+    return data, (platform, current_profile()), pos_filter, q
+
+def _board_json(board_df, drafted_order, version):
+    cols = ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff", "Trend"]
+    rows = board_df[cols].assign(idx=board_df.index).to_json(orient="records")
+    return f'{{"version": {json.dumps(version)}, "picks": {json.dumps(drafted_order)}, "board": {rows}}}'
 
 def draft_route(app):
     @app.route('/draft', methods=['GET', 'POST'])
     def draft():
-        platform = request.args.get('platform', 'sleeper')
         pos_filter = request.args.get('pos', '')  # '' means All
         q = request.args.get('q', '').strip()
 
-        # Initialize drafted list
-        drafted_order = session.get('drafted_players', []) or []
+        # Picks and league settings live in the server-side room shared by
+        # everyone watching it; ?platform= switches the room's platform
+        room = _current_room()
+        requested = request.args.get('platform')
+        room.configure(platform=checked_platform(requested) if requested else None)
+        platform = _room_platform(room)
+        drafted_order, seq = room.snapshot()
 
         if request.method == 'POST':
             # Preserve current filters on POST
@@ -155,90 +488,304 @@ def draft_route(app):
 
             # End Draft
             if request.form.get('end_draft') == '1':
-                session['drafted_players'] = []
+                room.reset()
                 return redirect(url_for('home'))
 
+            # Undo last pick / redo the last undone one; redirects name the room so
+            # the page stays on it even if another tab changes the session's room
+            if request.form.get('undo') == '1':
+                room.undo()
+                return redirect(url_for('draft', room=room.room_id, platform=platform, pos=pos_filter or None, q=q or None))
+            if request.form.get('redo') == '1':
+                room.redo()
+                return redirect(url_for('draft', room=room.room_id, platform=platform, pos=pos_filter or None, q=q or None))
+
             # Mark Drafted (PRG)
             drafted_idx = request.form.get('drafted_idx')
             if drafted_idx is not None:
                 try:
                     drafted_idx = int(drafted_idx)
                 except ValueError:
-                    return redirect(url_for('draft', platform=platform, pos=pos_filter or None, q=q or None))
-                if drafted_idx not in drafted_order:
-                    drafted_order.append(drafted_idx)
-                    session['drafted_players'] = drafted_order
-                return redirect(url_for('draft', platform=platform, pos=pos_filter or None, q=q or None))
-
-        # Get cached rankings
-        df = _get_rankings_cached(platform)
-
-        # Split into board and drafted
-        drafted_set = set(drafted_order)
-        board_df = df.loc[~df.index.isin(drafted_set)]
-        drafted_df = df.loc[df.index.isin(drafted_set)]
-
-        # Apply POS filter if selected
-        if pos_filter:
-            board_df = board_df[board_df['POS'] == pos_filter]
-            drafted_df = drafted_df[drafted_df['POS'] == pos_filter]
-
-        # Apply fast substring filter on player name (case-insensitive)
-        if q:
-            key = q.lower()
-            # Use precomputed lowercase column and regex=False for speed
-            if 'name_key' not in board_df.columns:
-                # In case of sliced DF losing the column (shouldn't happen), recompute cheaply
-                board_df = board_df.assign(name_key=board_df["Player Team (Bye)"].astype(str).str.lower())
-            if 'name_key' not in drafted_df.columns and not drafted_df.empty:
-                drafted_df = drafted_df.assign(name_key=drafted_df["Player Team (Bye)"].astype(str).str.lower())
-            board_df = board_df[board_df['name_key'].str.contains(key, regex=False, na=False)]
-            drafted_df = drafted_df[drafted_df['name_key'].str.contains(key, regex=False, na=False)]
+                    return redirect(url_for('draft', room=room.room_id, platform=platform, pos=pos_filter or None, q=q or None))
+                # Only players on the board: a stray id would mark someone else or grow the mask
+                if drafted_idx < 0 or drafted_idx not in _get_rankings_cached((platform, current_profile())).index:
+                    return "unknown player", 400
+                room.pick(drafted_idx)
+                return redirect(url_for('draft', room=room.room_id, platform=platform, pos=pos_filter or None, q=q or None))
+
+        # Get cached rankings, ordered by this browser's ranking profile
+        profile = current_profile()
+        view = (platform, profile)
+        df = _get_rankings_cached(view)
+
+        # Everything the page is rendered from: a matching revalidation is a 304
+        teams, slot = _league_settings()
+        settings = _league()
+        tag = http_cache.etag(
+            "draft", pos_filter, q, _rankings_version(view), tuple(profiles()), room.room_id, seq,
+            tuple(drafted_order), settings, slot, room.settings['lineup'], asset_url("draft.css"), asset_url("draft.js"),
+        )
+        cached = http_cache.not_modified(tag)
+        if cached is not None:
+            return cached
+
+        # Split into board and drafted, then apply the POS / search filters
+        taken = room.taken_mask(df.index)
+        board_df = _filter_frame(df.loc[~taken], pos_filter, q, _search_index(view))
+        drafted_df = _filter_frame(df.loc[taken], pos_filter, q, _search_index(view))
 
         # Build position filter options from full DF (so options don’t disappear)
         positions = sorted(p for p in df['POS'].dropna().unique().tolist())
         pos_options = ["<option value=''>All</option>"] + [
-            f"<option value='{p}'{' selected' if p == pos_filter else ''}>{p}</option>"
+            f"<option value='{html.escape(p)}'{' selected' if p == pos_filter else ''}>{html.escape(p)}</option>"
             for p in positions
         ]
+        profile_options = "".join(
+            f"<option value='{name}'{' selected' if name == profile else ''}>{name}</option>"
+            for name in profiles()
+        )
         # Filter/search form: submit via Enter or Apply button
+        lineup = room.settings['lineup'] or DEFAULT_LINEUP
         filter_form = (
             "<form method='get' class='filter' style='margin:0 0 16px 0; display:flex; gap:10px; align-items:center;'>"
-            f"<input type='hidden' name='platform' value='{platform}'>"
-            "<label for='pos' style='font-weight:600;color:#444;'>Position:</label>"
+            f"<input type='hidden' name='room' value='{html.escape(room.room_id)}'>"
+            f"<input type='hidden' name='platform' value='{html.escape(platform)}'>"
+            "<label for='profile' style='font-weight:600;color:#444;'>Rankings:</label>"
+            f"<select name='profile' id='profile'>{profile_options}</select>"
+            "<label for='pos' style='font-weight:600;color:#444;margin-left:10px;'>Position:</label>"
             f"<select name='pos' id='pos'>{''.join(pos_options)}</select>"
             "<label for='q' style='font-weight:600;color:#444;margin-left:10px;'>Search:</label>"
-            f"<input type='text' id='q' name='q' value='{q}' placeholder='Search players...' "
+            f"<input type='text' id='q' name='q' value='{html.escape(q)}' placeholder='Search players...' list='player-suggest' autocomplete='off' "
             "style='padding:6px 10px; border:1px solid #d0d7de; border-radius:6px; min-width:220px;'>"
+            "<datalist id='player-suggest'></datalist>"
+            "<label for='teams' style='font-weight:600;color:#444;margin-left:10px;'>Teams:</label>"
+            f"<input type='number' id='teams' name='teams' value='{teams}' min='2' max='32' style='width:56px;'>"
+            "<label for='slot' style='font-weight:600;color:#444;'>My slot:</label>"
+            f"<input type='number' id='slot' name='slot' value='{slot or ''}' min='0' max='{teams}' placeholder='-' style='width:56px;'>"
+            "<label for='lineup' style='font-weight:600;color:#444;'>Lineup:</label>"
+            f"<input type='text' id='lineup' name='lineup' value='{html.escape(lineup)}' style='width:190px;'>"
             "<button type='submit' class='btn btn-primary' style='margin-left:8px;'>Apply</button>"
             "</form>"
         )
 
         # Render tables
-        board_html = _render_board_table(board_df, pos_filter, q)
-        drafted_html = _render_drafted_table(drafted_df, drafted_order)
+        version = _rankings_version(view)
+        live = _live_columns(df, room, drafted_order, view)
+        board_head, board_rows, board_tail = _board_table_parts(board_df, view, version, live)
+        drafted_html = _render_drafted_table(drafted_df, drafted_order, view, version)
 
-        # End Draft button (preserve filters)
+        # Undo / End Draft buttons (preserve filters)
         end_draft_html = (
-            "<form method='POST' class='end-draft' style='position:absolute; right:0; top:0;'>"
+            "<div class='end-draft' style='position:absolute; right:0; top:0; display:flex; gap:8px;'>"
+            "<form method='POST' id='undo-pick' style='margin:0;'>"
+            "<input type='hidden' name='undo' value='1'/>"
+            "<button class='btn' type='submit'>Undo Pick</button>"
+            "</form>"
+            "<form method='POST' id='redo-pick' style='margin:0;'>"
+            "<input type='hidden' name='redo' value='1'/>"
+            "<button class='btn' type='submit'>Redo Pick</button>"
+            "</form>"
+            "<form method='POST' style='margin:0;'>"
             "<input type='hidden' name='end_draft' value='1'/>"
-            f"<input type='hidden' name='pos' value='{pos_filter or ''}'/>"
-            f"<input type='hidden' name='q' value='{q or ''}'/>"
+            f"<input type='hidden' name='pos' value='{html.escape(pos_filter or '')}'/>"
+            f"<input type='hidden' name='q' value='{html.escape(q or '')}'/>"
             "<button class='btn btn-danger' type='submit'>End Draft</button>"
             "</form>"
+            "</div>"
+        )
+
+        # Filled in by the page script, which refreshes it after every pick
+        plan_html = (
+            "<div class='card plan' id='draft-plan'><strong>Draft Plan</strong><ol></ol></div>"
+            if slot else ""
         )
 
-        return f"""
-{DRAFT_PAGE_CSS}
-<div class="container">
+        page_head = f"""
+<link rel='stylesheet' href='{asset_url("draft.css")}'>
+<div class="container" id="draft-root" data-room="{html.escape(room.room_id)}" data-seq="{seq}">
   <div class="header">
     <h1>Fantasy Football Draft Board</h1>
     {end_draft_html}
   </div>
   {filter_form}
+  {plan_html}
+  <div style="margin:0 0 12px 0; color:#6b7280;">Room <a href="{html.escape(url_for('draft', room=room.room_id, platform=platform))}">{html.escape(room.room_id)}</a> &middot; share this link to follow the draft live</div>
   <div class="grid">
-    {board_html}
+    {board_head}"""
+        page_tail = f"""{board_tail}
     {drafted_html}
   </div>
 </div>
+<script src='{asset_url("draft.js")}'></script>
 """
+        if len(board_rows) >= _STREAM_MIN_ROWS:
+            # Large boards go out in row batches instead of one giant string
+            return http_cache.tagged(Response(iter_table(page_head, board_rows, page_tail), mimetype="text/html"), tag)
+        return http_cache.tagged(page_head + "".join(board_rows) + page_tail, tag)
+
+    @app.route('/api/draft/board')
+    def draft_board_api():
+        _, view, pos_filter, q = _api_args()
+        room = _current_room()
+        drafted_order, _ = room.snapshot()
+        df = _get_rankings_cached(view)
+        board_df = _filter_frame(df.loc[~room.taken_mask(df.index)], pos_filter, q, _search_index(view))
+        body = _board_json(board_df, drafted_order, _rankings_version(view))
+        return Response(body, mimetype="application/json")
+
+    @app.route('/api/draft/rooms', methods=['POST'])
+    def draft_rooms_api():
+        # New room with its own league settings; join it at /draft?room=<id>
+        data = request.get_json(silent=True) or {}
+        try:
+            teams = int(data.get('teams', 12))
+            lineup = data.get('lineup') or None
+            LeagueSettings.parse(teams, lineup or DEFAULT_LINEUP)
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'status': 'error', 'error': 'invalid teams or lineup'}), 400
+        if teams < 2:
+            return jsonify({'status': 'error', 'error': 'invalid teams or lineup'}), 400
+        platform = data.get('platform') or None
+        if platform is not None and platform not in platforms():
+            return jsonify({'status': 'error', 'error': 'unknown platform'}), 400
+        room = get_room(uuid.uuid4().hex[:10])
+        settings = room.configure(teams=teams, platform=platform, lineup=lineup)
+        return jsonify({'status': 'ok', 'room': room.room_id, 'settings': settings,
+                        'url': url_for('draft', room=room.room_id)})
+
+    @app.route('/api/draft/picks')
+    def draft_picks_api():
+        # Compact diff for clients that already have the board: picks after `since`
+        drafted_order, _ = _current_room().snapshot()
+        since = request.args.get('since', 0, type=int)
+        return jsonify({'picks': drafted_order[since:], 'count': len(drafted_order)})
+
+    @app.route('/api/draft/pick', methods=['POST'])
+    def draft_pick_api():
+        data, view, pos_filter, q = _api_args()
+        try:
+            drafted_idx = int(data.get('idx'))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'error': 'invalid idx'}), 400
+        df = _get_rankings_cached(view)
+        if drafted_idx not in df.index:
+            return jsonify({'status': 'error', 'error': 'unknown player'}), 404
+        room = _current_room()
+        room.pick(drafted_idx)
+        drafted_order, _ = room.snapshot()
+        # Only the new drafted row goes back, and only if it passes the filters
+        return jsonify({
+            'status': 'ok',
+            'idx': drafted_idx,
+            'count': len(drafted_order),
+            'drafted_row': _drafted_row(df, drafted_idx, drafted_order, view, pos_filter, q),
+        })
+
+    @app.route('/api/draft/undo', methods=['POST'])
+    def draft_undo_api():
+        _, view, pos_filter, q = _api_args()
+        room = _current_room()
+        drafted_idx = room.undo()
+        if drafted_idx is None:
+            return jsonify({'status': 'empty', 'count': 0})
+        drafted_order, _ = room.snapshot()
+        df = _get_rankings_cached(view)
+        rows = []
+        if drafted_idx in df.index:
+            row_df = _filter_frame(df.loc[[drafted_idx]], pos_filter, q, _search_index(view))
+            if not row_df.empty:
+                live = _live_columns(df, room, drafted_order, view)
+                rows = _board_rows(row_df, view, _rankings_version(view), live)
+        return jsonify({
+            'status': 'ok',
+            'idx': drafted_idx,
+            'count': len(drafted_order),
+            'board_row': rows[0] if rows else None,
+        })
+
+    @app.route('/api/draft/redo', methods=['POST'])
+    def draft_redo_api():
+        _, view, pos_filter, q = _api_args()
+        room = _current_room()
+        drafted_idx = room.redo()
+        drafted_order, _ = room.snapshot()
+        if drafted_idx is None:
+            return jsonify({'status': 'empty', 'count': len(drafted_order)})
+        df = _get_rankings_cached(view)
+        return jsonify({
+            'status': 'ok',
+            'idx': drafted_idx,
+            'count': len(drafted_order),
+            'drafted_row': _drafted_row(df, drafted_idx, drafted_order, view, pos_filter, q),
+        })
+
+    @app.route('/api/draft/row')
+    def draft_row_api():
+        # Board row for one player, used by watchers to put back an undone pick
+        _, view, pos_filter, q = _api_args()
+        idx = request.args.get('idx', type=int)
+        df = _get_rankings_cached(view)
+        if idx is None or idx not in df.index:
+            return jsonify({'status': 'error', 'error': 'unknown player'}), 404
+        row_df = _filter_frame(df.loc[[idx]], pos_filter, q, _search_index(view))
+        rows = []
+        if not row_df.empty:
+            room = _current_room()
+            drafted_order, _ = room.snapshot()
+            live = _live_columns(df, room, drafted_order, view)
+            rows = _board_rows(row_df, view, _rankings_version(view), live)
+        return jsonify({'status': 'ok', 'idx': idx, 'board_row': rows[0] if rows else None})
+
+    @app.route('/api/draft/live')
+    def draft_live_api():
+        # Fresh VOR / "Avail @ Next Pick" cells for the board after the draft moved on
+        _, view, _, _ = _api_args()
+        room = _current_room()
+        drafted_order, _ = room.snapshot()
+        df = _get_rankings_cached(view)
+        _, live = _live_columns(df, room, drafted_order, view)
+        live = live.loc[~room.taken_mask(live.index)]
+        cells = {
+            css: dict(zip(live.index.tolist(), _LIVE_TEXT[col](live[col]).tolist()))
+            for col, _, css in _LIVE_COLS if col in live.columns
+        }
+        return jsonify({'status': 'ok', 'count': len(drafted_order), 'cells': cells})
+
+    @app.route('/api/draft/plan')
+    def draft_plan_api():
+        # Recommended position for each of my remaining picks (needs My slot)
+        _, view, _, _ = _api_args()
+        room = _current_room()
+        drafted_order, _ = room.snapshot()
+        steps = _draft_plan(_get_rankings_cached(view), room, drafted_order)
+        if steps is None:
+            return jsonify({'status': 'error', 'error': 'set your draft slot first'}), 400
+        return jsonify({'status': 'ok', 'count': len(drafted_order), 'steps': steps})
+
+    @app.route('/api/draft/search')
+    def draft_search_api():
+        # Typeahead: available players matching q / pos, best-ranked first.
+        # Answered from the search index and the room's pick mask alone.
+        _, view, pos_filter, q = _api_args()
+        limit = request.args.get('limit', 10, type=int)
+        _get_rankings_cached(view)
+        index = _search_index(view)
+        ids = index.lookup(q, pos_filter)
+        ids = index.ranked(ids[~_current_room().taken_mask(ids)]).tolist()
+        players = [
+            {'idx': pid, 'name': index.display[pid], 'pos': index.pos[pid], 'rank': index.rank(pid)}
+            for pid in ids[:limit]
+        ]
+        return jsonify({'q': q, 'ids': ids, 'players': players})
+
+    @app.route('/api/draft/stream')
+    def draft_stream():
+        # Server-Sent Events: one small event per pick/undo/reset in this room
+        room = _current_room()
+        last_id = request.headers.get('Last-Event-ID', request.args.get('since'))
+        last_seq = int(last_id) if last_id and last_id.isdigit() else None
+        return Response(
+            room.stream(last_seq),
+            mimetype="text/event-stream",
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
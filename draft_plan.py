@@ -0,0 +1,141 @@
+import numpy as np
+
+from availability import AVAIL_NOISE
+
+# Pick plan for the rest of my draft: which position to take at each of my
+# remaining picks. Opponents are modelled as in availability.py (noisy ADP).
+# From one batch of simulations we get, for every position, each of my picks
+# and k = 1, 2, ..., the expected score of the k-th best player at that
+# position still on the board then. A dynamic program over roster counts
+# (the pick index is implied by how many players I hold) then picks the
+# position sequence with the highest expected value, scoring a player fully
+# while the player fills a starting or flex slot and at BENCH_WEIGHT after that.
+# States are bounded by per-position caps, so a 12-team, 18-round plan is a
+# few thousand states rather than 6^18 sequences.
+PLAN_SIMS = 400
+PLAN_SEED = 0
+BENCH_WEIGHT = 0.35
+EXTRA_CAPS = {"QB": 1, "TE": 1, "K": 0, "DST": 0}  # most held beyond starters; others: starters + flex + 4
+PLAN_TARGETS = 3  # likely players listed per planned pick
+
+
+def my_pick_numbers(teams, slot, rounds):
+    """Overall pick numbers (1-based) of ``slot`` in a snake draft."""
+    return [r * teams + (slot if r % 2 == 0 else teams - slot + 1) for r in range(rounds)]
+
+
+def _caps(settings, positions):
+    starters = dict(settings.starters)
+    flexible = {p for eligible in settings.flex for p in eligible}
+    caps = {}
+    for pos in positions:
+        base = starters.get(pos, 0)
+        if pos in EXTRA_CAPS:
+            caps[pos] = base + EXTRA_CAPS[pos]
+        elif base or pos in flexible:
+            caps[pos] = base + len(settings.flex) + 4
+        else:
+            caps[pos] = 0
+    return caps
+
+
+def _survivor_values(rank, gaps, scores, cap):
+    """``[pick][k-1]``: expected score of the k-th best survivor among these players."""
+    order = np.argsort(-scores, kind="stable")
+    ranked = rank[:, order]
+    padded = np.append(scores[order], 0.0)
+    ks = np.arange(1, cap + 1)
+    out = np.zeros((len(gaps), cap))
+    for j, gap in enumerate(gaps):
+        seen = np.cumsum(ranked >= gap, axis=1)
+        # Index of the k-th survivor = how many prefixes hold fewer than k
+        idx = (seen[:, :, None] < ks).sum(axis=1)
+        out[j] = padded[idx].mean(axis=0)
+    return out
+
+
+def plan(positions, scores, adp, roster, settings, pick_no, slot, sims=PLAN_SIMS, seed=PLAN_SEED):
+    """Best position for each of my remaining picks.
+
+    ``positions``, ``scores`` and ``adp`` describe the players still on the
+    board; ``roster`` is ``{POS: count}`` of my picks so far and ``pick_no``
+    the overall number of the pick about to be made. Returns
+    ``(steps, availability)``: one ``{"pick", "pos", "value"}`` per remaining
+    pick, and P(available) per player (rows) at each of those picks (columns).
+    """
+    positions = np.asarray(positions, dtype=object)
+    scores = np.asarray(scores, dtype=float)
+    adp = np.asarray(adp, dtype=float)
+    held = sum(roster.values())
+    mine = [p for p in my_pick_numbers(settings.teams, slot, settings.rounds) if p >= pick_no]
+    mine = mine[:max(0, settings.rounds - held)]
+    if not mine or not len(scores):
+        return [], np.zeros((len(scores), 0))
+    # Opponent picks between now and each of my picks
+    gaps = np.array([m - pick_no - j for j, m in enumerate(mine)])
+
+    n = len(adp)
+    filled = np.where(np.isnan(adp), np.nanmax(adp, initial=0) + 1 + np.arange(n), adp)
+    rng = np.random.default_rng(seed)
+    draws = filled + rng.standard_normal((sims, n)) * np.maximum(1.0, AVAIL_NOISE * filled)
+    rank = np.empty((sims, n), dtype=np.int32)
+    np.put_along_axis(rank, np.argsort(draws, axis=1), np.arange(n, dtype=np.int32), axis=1)
+    availability = np.stack([(rank >= g).mean(axis=0) for g in gaps], axis=1)
+
+    pos_list = sorted(set(positions.tolist()) | set(roster))
+    caps = _caps(settings, pos_list)
+    tables = []
+    for pos in pos_list:
+        cols = np.flatnonzero(positions == pos)
+        room = caps[pos] - roster.get(pos, 0)
+        tables.append(_survivor_values(rank[:, cols], gaps, scores[cols], caps[pos]) if room > 0 and len(cols) else None)
+
+    # Counts are tuples over ``pos_list``; positions with nobody left to pick
+    # still count towards their starting and flex slots
+    starters = [dict(settings.starters).get(p, 0) for p in pos_list]
+    flexible = [[i for i, p in enumerate(pos_list) if p in eligible] for eligible in sorted(settings.flex, key=len)]
+    in_flex = [any(i in eligible for eligible in flexible) for i in range(len(pos_list))]
+    pickable = [i for i, t in enumerate(tables) if t is not None]
+    cap = [caps[p] for p in pos_list]
+    memo = {}
+
+    def best(counts):
+        result = memo.get(counts)
+        if result is not None:
+            return result
+        j = sum(counts) - held
+        if j >= len(mine):
+            return 0.0, None
+        need = [max(0, s - c) if t is not None else 0 for s, c, t in zip(starters, counts, tables)]
+        spill = [max(0, c - s) for s, c in zip(starters, counts)]
+        flex_open = 0
+        for eligible in flexible:
+            used = next((i for i in eligible if spill[i] > 0), None)
+            if used is None:
+                flex_open += 1
+            else:
+                spill[used] -= 1
+        # Leave enough picks to fill every dedicated starting slot
+        slack = len(mine) - j - 1 - sum(need)
+        result = (-np.inf, None)
+        for i in pickable:
+            c = counts[i]
+            if c >= cap[i] or slack + (need[i] > 0) < 0:
+                continue
+            starting = need[i] > 0 or (flex_open > 0 and in_flex[i])
+            gain = tables[i][j, c] * (1.0 if starting else BENCH_WEIGHT)
+            total = gain + best(counts[:i] + (c + 1,) + counts[i + 1:])[0]
+            if total > result[0]:
+                result = (total, i)
+        memo[counts] = result
+        return result
+
+    steps = []
+    counts = tuple(roster.get(p, 0) for p in pos_list)
+    for j, pick in enumerate(mine):
+        _, i = best(counts)
+        if i is None:
+            break
+        steps.append({"pick": int(pick), "pos": pos_list[i], "value": float(tables[i][j, counts[i]])})
+        counts = counts[:i] + (counts[i] + 1,) + counts[i + 1:]
+    return steps, availability
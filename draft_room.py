@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+import draft_store
+
+# Server-side draft rooms. Every browser on the same room sees the same picks,
+# and each change is broadcast to subscribers as a Server-Sent Event. Picks
+# are stable player ids, mirrored in a boolean mask indexed by player id for
+# O(1) "is this player taken?".
+#
+# Every action (pick, undo, redo, reset) is an event appended to the room's
+# log in draft_store, numbered by the room's seq, with a snapshot of the pick
+# list every SNAPSHOT_EVERY events; a room is rebuilt by replaying the events
+# after its latest snapshot (replay). Other worker processes may hold the same
+# room: an action first applies whatever they logged since (in the same
+# transaction it logs its own event in), and watchers poll the log every
+# SYNC_SECONDS, so every process sees every pick. Undo moves the last pick onto a redo
+# stack and redo moves it back, both O(1); a new pick clears the stack. An event
+# is serialized once into its SSE frame and kept in a short ring buffer;
+# subscribers block on the room's condition variable and read frames from the
+# buffer, so fan-out costs one notify_all plus one socket write per watcher.
+#
+# Any number of rooms live in one process. Each has its own league settings
+# (size, platform, lineup) and its own lock, so picks in different rooms never
+# wait on each other; the player frame they are drawn from is shared per
+# platform (draft._df_cache), so a room holds nothing but its pick state.
+DEFAULT_SETTINGS = {"teams": 12, "platform": "sleeper", "lineup": None}
+SNAPSHOT_EVERY = 50     # events between pick-list snapshots
+EVENT_BUFFER = 256      # events kept for reconnecting clients (Last-Event-ID)
+KEEPALIVE_SECONDS = 15  # comment frame sent when a room is idle
+SYNC_SECONDS = 1        # how often watchers check the log for other processes' events
+
+_rooms = {}  # { room_id: DraftRoom }
+_rooms_lock = threading.Lock()
+
+
+def replay(picks, redo, events):
+    """Apply ``(seq, kind, player_id)`` events to the ``picks`` and ``redo`` lists in place."""
+    for _, kind, player_id in events:
+        if kind == "pick":
+            picks.append(player_id)
+            redo.clear()
+        elif kind == "undo":
+            # Nothing to undo / redo: a no-op, as it was when it happened
+            if picks:
+                redo.append(picks.pop())
+        elif kind == "redo":
+            if redo:
+                picks.append(redo.pop())
+        elif kind == "reset":
+            picks.clear()
+            redo.clear()
+    return picks, redo
+
+
+class DraftRoom:
+    def __init__(self, room_id):
+        self.room_id = room_id
+        self._events = deque(maxlen=EVENT_BUFFER)  # (seq, sse frame)
+        self._pending = []  # (seq, sse frame) logged in the open transaction
+        self._cond = threading.Condition()
+        self._load()
+        # Replaced, never mutated, so it can be read without the lock
+        self.settings = {**DEFAULT_SETTINGS, **draft_store.load_settings(room_id)}
+
+    def _load(self):
+        (self.seq, picks, redo), events = draft_store.load_log(self.room_id)
+        self.picks, self._redo = replay(picks, redo, events)
+        if events:
+            self.seq = events[-1][0]
+        self._unsnapshotted = len(events)
+        self._retake()
+
+    def _retake(self):
+        self._taken = np.zeros(max(self.picks, default=0) + 1, dtype=bool)
+        self._taken[[pid for pid in self.picks if pid >= 0]] = True  # no wrap-around on a bad old log
+
+    def _frame(self, seq, kind, idx, ts):
+        data = {"idx": idx} if idx is not None else {}
+        data.update(type=kind, seq=seq, count=len(self.picks), redo=len(self._redo), ts=ts)
+        return seq, f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+    def _catch_up(self, conn=None):
+        # Caller holds self._cond: apply events other processes logged after ours
+        events = draft_store.events_after(self.room_id, self.seq, conn)
+        for seq, kind, idx, ts in events:
+            replay(self.picks, self._redo, [(seq, kind, idx)])
+            self.seq = seq
+            self._pending.append(self._frame(seq, kind, idx, ts))
+        if events:
+            self._retake()
+
+    def _notify(self):
+        # Caller holds self._cond: hand frames from committed events to the watchers
+        if self._pending:
+            self._events.extend(self._pending)
+            self._pending = []
+            self._cond.notify_all()
+
+    @contextmanager
+    def _writing(self):
+        """Transaction for one action. Caller holds self._cond and applies the action once caught up."""
+        try:
+            with draft_store.transaction() as conn:
+                self._catch_up(conn)
+                yield conn
+        except BaseException:
+            # Memory may be ahead of what was committed: start again from the log
+            self._pending = []
+            self._events.clear()
+            self._load()
+            raise
+        self._notify()
+
+    def _log(self, conn, kind, idx=None):
+        # Caller is inside _writing and has applied the event to memory
+        seq, ts = self.seq + 1, time.time()
+        draft_store.append_event(conn, self.room_id, seq, kind, idx, ts)
+        self.seq = seq
+        self._unsnapshotted += 1
+        if self._unsnapshotted >= SNAPSHOT_EVERY:
+            draft_store.save_snapshot(conn, self.room_id, seq, self.picks, self._redo)
+            self._unsnapshotted = 0
+        self._pending.append(self._frame(seq, kind, idx, ts))
+
+    def sync(self):
+        """Apply events other processes have logged for this room."""
+        with self._cond:
+            self._catch_up()
+            self._notify()
+
+    def configure(self, **changes):
+        """Update league settings (None leaves one as is); returns the settings."""
+        with self._cond:
+            changes = {k: v for k, v in changes.items() if v is not None and self.settings.get(k) != v}
+            if changes:
+                self.settings = {**self.settings, **changes}
+                draft_store.save_settings(self.room_id, self.settings)
+            return self.settings
+
+    def is_taken(self, player_id):
+        return 0 <= player_id < len(self._taken) and bool(self._taken[player_id])
+
+    def taken_mask(self, player_ids):
+        """Boolean array: which of ``player_ids`` have been picked in this room."""
+        ids = np.asarray(player_ids, dtype=np.int64)
+        taken = self._taken
+        mask = np.zeros(len(ids), dtype=bool)
+        inside = (ids >= 0) & (ids < len(taken))
+        mask[inside] = taken[ids[inside]]
+        return mask
+
+    def _mark(self, idx, taken):
+        if idx < 0:
+            raise ValueError(f"invalid player id {idx}")
+        if idx >= len(self._taken):
+            grown = np.zeros(max(idx + 1, 2 * len(self._taken)), dtype=bool)
+            grown[:len(self._taken)] = self._taken
+            self._taken = grown
+        self._taken[idx] = taken
+
+    def pick(self, idx):
+        """Record a pick; returns False if the player was already taken."""
+        if idx < 0:
+            raise ValueError(f"invalid player id {idx}")
+        with self._cond, self._writing() as conn:
+            if self.is_taken(idx):
+                return False
+            self.picks.append(idx)
+            self._redo.clear()
+            self._mark(idx, True)
+            self._log(conn, "pick", idx)
+            return True
+
+    def undo(self):
+        """Remove the most recent pick and return it (None if there are none)."""
+        with self._cond, self._writing() as conn:
+            if not self.picks:
+                return None
+            idx = self.picks.pop()
+            self._redo.append(idx)
+            self._mark(idx, False)
+            self._log(conn, "undo", idx)
+            return idx
+
+    def redo(self):
+        """Put back the most recently undone pick and return it (None if there are none)."""
+        with self._cond, self._writing() as conn:
+            if not self._redo:
+                return None
+            idx = self._redo.pop()
+            self.picks.append(idx)
+            self._mark(idx, True)
+            self._log(conn, "redo", idx)
+            return idx
+
+    def reset(self):
+        with self._cond, self._writing() as conn:
+            self.picks = []
+            self._redo = []
+            self._taken[:] = False
+            self._log(conn, "reset")
+
+    def snapshot(self):
+        with self._cond:
+            self._catch_up()
+            self._notify()
+            return list(self.picks), self.seq
+
+    def events_since(self, seq, timeout=KEEPALIVE_SECONDS):
+        """Block until there are events after ``seq`` (or ``timeout``); return their ``(seq, frame)`` pairs.
+
+        Returns None when ``seq`` has fallen out of the buffer and the client
+        has to resync from a full snapshot.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.seq <= seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                # Woken by a local event, or every SYNC_SECONDS to look for other processes' ones
+                if not self._cond.wait(min(remaining, SYNC_SECONDS)):
+                    self._catch_up()
+                    self._notify()
+            # Older than the buffer (or than this process: seq survives restarts)
+            if not self._events or self._events[0][0] > seq + 1:
+                return None
+            return [(s, frame) for s, frame in self._events if s > seq]
+
+    def stream(self, last_seq=None):
+        """SSE generator for one subscriber, starting after ``last_seq`` (default: now)."""
+        seq = self.seq if last_seq is None else last_seq
+        yield f"retry: 2000\n: room {self.room_id}\n\n"
+        while True:
+            frames = self.events_since(seq)
+            if frames is None:
+                # Too far behind to replay: tell the client to reload the board
+                seq = self.seq
+                yield f"id: {seq}\nevent: resync\ndata: {{}}\n\n"
+            elif frames:
+                seq = frames[-1][0]
+                yield "".join(frame for _, frame in frames)
+            else:
+                yield ": keepalive\n\n"
+
+
+def get_room(room_id):
+    room = _rooms.get(room_id)
+    if room is None:
+        # Loaded outside the lock so opening one room doesn't stall the others;
+        # if two requests race, the first one stored wins
+        loaded = DraftRoom(room_id)
+        with _rooms_lock:
+            room = _rooms.setdefault(room_id, loaded)
+    return room
@@ -0,0 +1,181 @@
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import db
+import metrics
+
+# Durable draft state, per draft id: league settings and an append-only log
+# of draft events (pick, undo, redo, reset) numbered by seq, plus a snapshot of
+# the pick list every few events. Rooms keep their state in memory and write
+# through here; a restarted process rebuilds a room from its latest snapshot
+# and the events after it (load_log), so a restart or a cleared cookie no
+# longer loses a draft. draft_picks is the old pick-list table, read only as
+# the starting state of drafts that predate the log.
+#
+# Several worker processes can hold the same room, so an event is logged in a
+# transaction() that first reads the events other processes have logged since
+# (events_after): seq is assigned only once the room has caught up, and a
+# conflicting seq can't happen.
+#
+# Settings are group-committed instead: save_settings queues the statement and
+# returns, and one writer thread commits whatever has queued up in a single
+# transaction. Reads flush() first, so they see every queued write. A
+# statement that fails is logged and counted in
+# draft_store_write_errors_total rather than failing the rest of its batch,
+# and the writer keeps running whatever goes wrong.
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS draft_picks ("
+    " draft_id TEXT NOT NULL, pick_no INTEGER NOT NULL, player_id INTEGER NOT NULL,"
+    " PRIMARY KEY (draft_id, pick_no))",
+    "CREATE TABLE IF NOT EXISTS draft_rooms (draft_id TEXT PRIMARY KEY, settings TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS draft_events ("
+    " draft_id TEXT NOT NULL, seq INTEGER NOT NULL, kind TEXT NOT NULL, player_id INTEGER, ts REAL NOT NULL,"
+    " PRIMARY KEY (draft_id, seq)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS draft_snapshots ("
+    " draft_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, picks TEXT NOT NULL, redo TEXT NOT NULL)",
+]
+_ready = False
+
+FLUSH_TIMEOUT = 5  # seconds a read waits for queued writes
+
+_queue = deque()  # (sql, params) or a flush() marker Event, oldest first
+_wake = threading.Event()
+_writer = None
+_writer_lock = threading.Lock()
+log = logging.getLogger(__name__)
+
+metrics.describe("draft_store_write_errors_total", "counter",
+                 "Queued draft writes that failed and were dropped, by table.")
+
+
+def _ensure_schema():
+    global _ready
+    if not _ready:
+        for sql in _SCHEMA:
+            db.execute(sql)
+        _ready = True
+
+
+def _dropped(sql, params, error):
+    table = sql.split(" INTO ", 1)[-1].split(" ", 1)[0]
+    log.error("draft write dropped (%s): %s %r", error, sql, params)
+    metrics.inc("draft_store_write_errors_total", table=table)
+
+
+def _commit(statements):
+    try:
+        _ensure_schema()
+        db.executebatch(statements)
+    except sqlite3.Error:
+        # Don't let one bad statement take the rest of the batch with it
+        for sql, params in statements:
+            try:
+                db.execute(sql, params)
+            except sqlite3.Error as e:
+                _dropped(sql, params, e)
+
+
+def _write_loop():
+    while True:
+        _wake.wait()
+        _wake.clear()
+        while _queue:
+            batch = []
+            while _queue:
+                batch.append(_queue.popleft())
+            statements = [item for item in batch if not isinstance(item, threading.Event)]
+            try:
+                if statements:
+                    _commit(statements)
+            except Exception as e:
+                # Anything else (no schema, disk full...): drop the batch, not the writer
+                for sql, params in statements:
+                    _dropped(sql, params, e)
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+
+
+def _enqueue(item):
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_loop, name="draft-store-writer", daemon=True)
+                _writer.start()
+    # deque.append is atomic: queueing takes no lock
+    _queue.append(item)
+    _wake.set()
+
+
+def flush(timeout=FLUSH_TIMEOUT):
+    """Wait until every write queued so far is committed; False on timeout."""
+    done = threading.Event()
+    _enqueue(done)
+    return done.wait(timeout)
+
+
+atexit.register(flush, 5)
+
+
+@contextmanager
+def transaction():
+    """A write transaction (BEGIN IMMEDIATE) for logging events: one process at a time."""
+    _ensure_schema()
+    with db.transaction() as conn:
+        yield conn
+
+
+def load_log(draft_id):
+    """``((seq, picks, redo), events)``: the latest snapshot and the ``(seq, kind, player_id)`` events after it."""
+    _ensure_schema()
+    rows = db.query("SELECT seq, picks, redo FROM draft_snapshots WHERE draft_id = ?", (draft_id,))
+    if rows:
+        seq, picks, redo = rows[0]
+        snapshot = (seq, json.loads(picks), json.loads(redo))
+    else:
+        legacy = db.query("SELECT player_id FROM draft_picks WHERE draft_id = ? ORDER BY pick_no", (draft_id,))
+        snapshot = (0, [pid for (pid,) in legacy], [])
+    events = db.query("SELECT seq, kind, player_id FROM draft_events WHERE draft_id = ? AND seq > ? ORDER BY seq",
+                      (draft_id, snapshot[0]))
+    return snapshot, events
+
+
+def events_after(draft_id, seq, conn=None):
+    """``[(seq, kind, player_id, ts)]`` logged for ``draft_id`` after ``seq``, e.g. by another process."""
+    _ensure_schema()
+    sql = "SELECT seq, kind, player_id, ts FROM draft_events WHERE draft_id = ? AND seq > ? ORDER BY seq"
+    if conn is not None:
+        return conn.execute(sql, (draft_id, seq)).fetchall()
+    return db.query(sql, (draft_id, seq))
+
+
+def append_event(conn, draft_id, seq, kind, player_id=None, ts=None):
+    """Log one event inside ``transaction()``."""
+    conn.execute("INSERT INTO draft_events (draft_id, seq, kind, player_id, ts) VALUES (?, ?, ?, ?, ?)",
+                 (draft_id, seq, kind, player_id, time.time() if ts is None else ts))
+
+
+def save_snapshot(conn, draft_id, seq, picks, redo):
+    conn.execute("INSERT OR REPLACE INTO draft_snapshots (draft_id, seq, picks, redo) VALUES (?, ?, ?, ?)",
+                 (draft_id, seq, json.dumps(picks), json.dumps(redo)))
+
+
+def load_settings(draft_id):
+    """League settings saved for ``draft_id`` (a dict, empty if none)."""
+    _ensure_schema()
+    flush()
+    rows = db.query("SELECT settings FROM draft_rooms WHERE draft_id = ?", (draft_id,))
+    return json.loads(rows[0][0]) if rows else {}
+
+
+def save_settings(draft_id, settings):
+    _enqueue(("INSERT OR REPLACE INTO draft_rooms (draft_id, settings) VALUES (?, ?)",
+              (draft_id, json.dumps(settings))))
@@ -1,301 +1,81 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, redirect, request, jsonify, url_for
+import html
+import io
 import pandas as pd
-import os
-from bs4 import BeautifulSoup
-import requests
-from utils import add_pos_rank, add_diff, make_table_html, load_rankings
-from draft import draft_route
+from utils import add_pos_rank, add_diff, add_trend, make_table_html, load_rankings, rankings_version
+import adp_history
+from adp_sources import platforms
+from players import known_ids, player_ids, player_info
+from rankings import (MAX_PROFILE_NAME, apply_moves, check_order, current_order, delete_profile, pack, profile_key,
+                      profiles, replace_order, unpack)
+from draft import checked_platform, current_profile, draft_route, invalidate_rankings_cache
+import metrics
+import http_cache
+from http_cache import asset_url
 
 app = Flask(__name__)
 app.secret_key = 'fantasy-draft-secret-key'
-
-def clean_pos_column(df):
-    if "POS" in df.columns:
-        df = df.copy()
-        df["POS"] = df["POS"].str.replace(r"\d+", "", regex=True)
-    return df
-
-def get_sleeper_adp():
-    url = "https://www.fantasypros.com/nfl/adp/overall.php"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return pd.DataFrame()
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", {"id": "data"})
-    if not table:
-        return pd.DataFrame()
-    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
-    rows = []
-    for tr in table.find("tbody").find_all("tr"):
-        cells = [td.text.strip() for td in tr.find_all("td")]
-        if cells:
-            rows.append(cells)
-    df = pd.DataFrame(rows, columns=headers)
-    df = clean_pos_column(df)
-    columns_to_keep = [col for col in ["Player Team (Bye)", "POS", "Team", "Sleeper"] if col in df.columns]
-    return df[columns_to_keep] if columns_to_keep else pd.DataFrame()
-
-def get_underdog_adp():
-    url = "https://www.fantasypros.com/nfl/adp/best-ball-overall.php"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return pd.DataFrame()
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", {"id": "data"})
-    if not table:
-        return pd.DataFrame()
-    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
-    rows = []
-    for tr in table.find("tbody").find_all("tr"):
-        cells = [td.text.strip() for td in tr.find_all("td")]
-        if cells:
-            rows.append(cells)
-    df = pd.DataFrame(rows, columns=headers)
-    df = clean_pos_column(df)
-    columns_to_keep = [col for col in ["Player Team (Bye)", "POS", "Underdog"] if col in df.columns]
-    return df[columns_to_keep] if columns_to_keep else pd.DataFrame()
-
-def join_adp_data(platform):
-  df_sleeper = get_sleeper_adp()
-  df_underdog = get_underdog_adp()
-  required_cols = ["Player Team (Bye)", "POS"]
-  if not all(col in df_sleeper.columns for col in required_cols):
-    return pd.DataFrame()
-  if not all(col in df_underdog.columns for col in required_cols):
-    return pd.DataFrame()
-  merged = pd.merge(
-    df_sleeper,
-    df_underdog,
-    on=["Player Team (Bye)", "POS"],
-    how="outer"
-  )
-  # Choose ADP column based on platform
-  if platform == "sleeper":
-    merged["ADP"] = merged["Sleeper"]
-  else:
-    merged["ADP"] = merged["Underdog"]
-  columns_order = ["Player Team (Bye)", "POS", "ADP"]
-  merged = merged[columns_order]
-  return merged
-
-def load_rankings(platform):
-  filename = "my_rankings.csv"
-  adp_df = join_adp_data(platform).reset_index(drop=True)
-  if os.path.exists(filename):
-    try:
-      # Load only order columns
-      order_df = pd.read_csv(filename)
-      # Merge with current ADP data
-      merged = order_df.merge(adp_df[["Player Team (Bye)", "POS", "ADP"]], on=["Player Team (Bye)", "POS"], how="left")
-      merged["My Ranking"] = range(1, len(merged) + 1)
-      return merged
-    except Exception:
-      pass
-  # If no saved order, use ADP order
-  adp_df["My Ranking"] = adp_df.index + 1
-  return adp_df
-
+metrics.init_app(app)
+http_cache.init_app(app)
 
 @app.route('/', methods=['GET', 'POST'])
 def home():
-  platform = request.form.get('platform', 'sleeper')
-  df = load_rankings(platform)
+  platform = request.values.get('platform')
+  platform = checked_platform(platform) if platform else 'sleeper'
+  profile = current_profile()
+  # Builds the ADP frame first, so a new snapshot is already in the history
+  # (and its version) when the tag is computed
+  platform_columns = platforms()
+  # Trend moves with the ADP history (and the day), not only with the rankings
+  version = (rankings_version(platform, profile), adp_history.version(platform))
+  tag = http_cache.etag("home", version, tuple(profiles()), asset_url("rankings.css"), asset_url("rankings.js"))
+  cached = http_cache.not_modified(tag)
+  if cached is not None:
+    return cached
+  df = load_rankings(platform, profile)
   df = add_diff(df)
   df = add_pos_rank(df)
-  table_html = make_table_html(df, ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff"], table_id='rankings-table', color_diff=True)
-  sortable_js = """
-<link href='https://fonts.googleapis.com/css?family=Inter:400,600&display=swap' rel='stylesheet'>
-<style>
-  body {
-    font-family: 'Inter', Arial, sans-serif;
-    background: #f6f8fa;
-    margin: 0;
-    padding: 0;
-  }
-  .container {
-    max-width: 900px;
-    margin: 40px auto;
-    background: #fff;
-    border-radius: 16px;
-    box-shadow: 0 4px 24px rgba(0,0,0,0.08);
-    padding: 32px 24px 24px 24px;
-  }
-  h1 {
-    font-size: 2.2rem;
-    font-weight: 600;
-    margin-bottom: 18px;
-    color: #222;
-    letter-spacing: -1px;
-  }
-  form {
-    display: flex;
-    align-items: center;
-    gap: 16px;
-    margin-bottom: 24px;
-  }
-  label {
-    font-weight: 600;
-    color: #444;
-    font-size: 1.05rem;
-  }
-  select {
-    font-size: 1rem;
-    padding: 6px 12px;
-    border-radius: 6px;
-    border: 1px solid #d0d7de;
-    background: #f6f8fa;
-    color: #222;
-    font-family: inherit;
-    transition: border 0.2s;
-  }
-  select:focus {
-    border-color: #0074d9;
-    outline: none;
-  }
-  table {
-    width: 100%;
-    border-collapse: collapse;
-    background: #fff;
-    font-size: 1rem;
-    border-radius: 12px;
-    overflow: hidden;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-  }
-  thead {
-    background: #f0f4f8;
-  }
-  th, td {
-    padding: 12px 10px;
-    text-align: left;
-  }
-  th {
-    font-weight: 600;
-    color: #333;
-    border-bottom: 2px solid #eaecef;
-  }
-  tr {
-    transition: background 0.15s;
-  }
-  tbody tr:hover {
-    background: #f6f8fa;
-  }
-  td {
-    border-bottom: 1px solid #eaecef;
-    color: #222;
-  }
-  td:last-child {
-    font-weight: 600;
-    text-align: center;
-    border-left: 1px solid #eaecef;
-  }
-  @media (max-width: 700px) {
-    .container {
-      padding: 12px 4px;
-    }
-    table, thead, tbody, th, td, tr {
-      font-size: 0.95rem;
-    }
-    th, td {
-      padding: 8px 4px;
-    }
-  }
-</style>
+  df = add_trend(df, platform)
+  table_html = make_table_html(df, ["My Ranking", "Player Team (Bye)", "POS", "POS Rank", "ADP", "Diff", "Trend"], table_id='rankings-table', color_diff=True, version=version)
+  platform_options = "".join(
+    f"<option value='{html.escape(key)}' {'selected' if platform == key else ''}>{html.escape(column)}</option>"
+    for key, column in platform_columns.items()
+  )
+  profile_options = "".join(
+    f"<option value='{name}' {'selected' if profile == name else ''}>{name}</option>"
+    for name in profiles()
+  )
+  scripts = f"""
 <script src='https://cdn.jsdelivr.net/npm/sortablejs@1.15.0/Sortable.min.js'></script>
-<script>
-  const tbody = document.querySelector('#rankings-table tbody');
-  function getTableData() {
-    let data = [];
-    Array.from(tbody.children).forEach(function(row, i) {
-      data.push({
-        "My Ranking": i + 1,
-        "Player Team (Bye)": row.children[1].textContent,
-        "POS": row.children[2].textContent,
-        "ADP": row.children[3].textContent
-      });
-    });
-    return data;
-  }
-  function saveRankings() {
-    const platform = document.getElementById('platform').value;
-    const rankings = getTableData();
-    fetch('/save_rankings', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ platform: platform, rankings: rankings })
-    });
-  }
-  function updateDiffs() {
-    // First, update My Ranking and Diff/Color
-    Array.from(tbody.children).forEach(function(row, i) {
-      row.children[0].textContent = i + 1;
-      let adp = parseFloat(row.children[4].textContent); // ADP is now col 4
-      let diff = null;
-      if (!isNaN(adp)) {
-        diff = (i + 1) - adp;
-      }
-      let color = '#fff';
-      if (diff !== null) {
-        let maxDiff = 10;
-        let norm = Math.max(-maxDiff, Math.min(maxDiff, diff));
-        if (norm < 0) {
-          let pct = Math.abs(norm) / maxDiff;
-          let r = Math.round(255 - 155 * pct);
-          let g = 255;
-          let b = Math.round(255 - 155 * pct);
-          color = `rgb(${r},${g},${b})`;
-        } else if (norm > 0) {
-          let pct = norm / maxDiff;
-          let r = 255;
-          let g = Math.round(255 - 155 * pct);
-          let b = Math.round(255 - 155 * pct);
-          color = `rgb(${r},${g},${b})`;
-        }
-      }
-      row.children[5].textContent = diff !== null ? diff : '';
-      row.children[5].style.background = color;
-    });
-    // Now, update POS Rank for each row
-    let rows = Array.from(tbody.children);
-    rows.forEach(function(row, i) {
-      let pos = row.children[2].textContent;
-      // Count number of rows with same POS and lower My Ranking (index)
-      let y = 1;
-      for (let j = 0; j < rows.length; j++) {
-        if (j === i) continue;
-        if (rows[j].children[2].textContent === pos && j < i) {
-          y++;
-        }
-      }
-      row.children[3].textContent = pos + y;
-    });
-  }
-  new Sortable(tbody, {
-    animation: 150,
-    onEnd: function () {
-      updateDiffs();
-      saveRankings();
-    }
-  });
-  updateDiffs();
-</script>
+<script src='{asset_url("rankings.js")}'></script>
 """
-  return f"""
+  return http_cache.tagged(f"""
+<link href='https://fonts.googleapis.com/css?family=Inter:400,600&display=swap' rel='stylesheet'>
+<link href='{asset_url("rankings.css")}' rel='stylesheet'>
 <div class="container">
   <h1>Fantasy Football Custom Rankings</h1>
-  <form method='post'>
+  <form method='get'>
     <label for='platform'>ADP Platform:</label>
     <select name='platform' id='platform' onchange='this.form.submit()'>
-      <option value='sleeper' {'selected' if platform == 'sleeper' else ''}>Sleeper</option>
-      <option value='underdog' {'selected' if platform == 'underdog' else ''}>Underdog</option>
+      {platform_options}
     </select>
+    <label for='profile'>Rankings:</label>
+    <select name='profile' id='profile' onchange='this.form.submit()'>
+      {profile_options}
+    </select>
+  </form>
+  <form method='post' action='/add_profile'>
+    <input type='hidden' name='platform' value='{html.escape(platform)}'>
+    <input type='text' name='name' placeholder='New rankings, e.g. superflex' maxlength='{MAX_PROFILE_NAME}' required>
+    <button type='submit'>Add</button>
   </form>
   <form action="/draft" method="get" style="margin-bottom:24px;">
     <button type="submit" style="background:#0074d9;color:#fff;padding:10px 18px;border:none;border-radius:8px;font-size:1.1rem;cursor:pointer;">Start Draft</button>
   </form>
   {table_html}
 </div>
-{sortable_js}
-"""
+{scripts}
+""", tag)
 
 # Register draft route
 draft_route(app)
@@ -304,11 +84,114 @@ draft_route(app)
 def save_rankings():
   data = request.get_json()
   rankings = data.get('rankings', [])
-  filename = "my_rankings.csv"
-  # Only save order columns
-  df = pd.DataFrame(rankings)[["Player Team (Bye)", "POS"]]
-  df.to_csv(filename, index=False)
+  # Only save order columns; the names are the page's, so they are all on record
+  try:
+    df = pd.DataFrame(rankings)[["Player Team (Bye)", "POS"]]
+  except (ValueError, KeyError):
+    return jsonify({'status': 'error', 'error': 'unreadable rankings'}), 400
+  ids = known_ids(df["Player Team (Bye)"], df["POS"])
+  if (ids < 0).any():
+    return jsonify({'status': 'error', 'error': 'unknown player'}), 400
+  try:
+    ids = check_order(ids)
+  except ValueError as e:
+    return jsonify({'status': 'error', 'error': str(e)}), 400
+  profile = current_profile()
+  replace_order(ids, profile)
+  invalidate_rankings_cache(profile)
   return jsonify({'status': 'ok'})
 
+@app.route('/move_rankings', methods=['POST'])
+def move_rankings():
+  data = request.get_json()
+  platform = checked_platform(data.get('platform') or 'sleeper')
+  profile = current_profile()
+  moves = data.get('moves', [])
+  # With nothing saved yet, the moves are relative to the ADP order the page showed
+  seed = lambda: load_rankings(platform, profile)["player_id"].tolist()
+  try:
+    applied = apply_moves(moves, seed=seed, profile=profile)
+  except ValueError as e:
+    return jsonify({'status': 'error', 'error': str(e)}), 400
+  if applied:
+    invalidate_rankings_cache(profile)
+  return jsonify({'status': 'ok', 'applied': applied})
+
+@app.route('/add_profile', methods=['POST'])
+def add_profile():
+  # The only way a profile comes to be: a copy of the order on screen, under a new name
+  platform = checked_platform(request.form.get('platform') or 'sleeper')
+  profile = profile_key(request.form.get('name', ''))
+  if not profile or len(profile) > MAX_PROFILE_NAME:
+    return jsonify({'status': 'error', 'error': 'invalid profile name'}), 400
+  if profile not in profiles():
+    replace_order(load_rankings(platform, current_profile())["player_id"].to_numpy(), profile)
+  return redirect(url_for('home', platform=platform, profile=profile))
+
+@app.route('/api/rankings/profiles')
+def ranking_profiles():
+  return jsonify({'profiles': profiles(), 'current': current_profile()})
+
+@app.route('/api/rankings/profiles/<name>', methods=['DELETE'])
+def delete_ranking_profile(name):
+  profile = profile_key(name)
+  if profile not in profiles():
+    return jsonify({'status': 'error', 'error': 'unknown profile'}), 404
+  delete_profile(profile)
+  invalidate_rankings_cache(profile)
+  return jsonify({'status': 'ok', 'profiles': profiles()})
+
+@app.route('/api/rankings/export')
+def export_rankings():
+  # ?format=ids (default): little-endian int32 player ids; ?format=csv: ids with names
+  profile = current_profile()
+  order = current_order(profile)
+  if request.args.get('format') == 'csv':
+    df = pd.DataFrame(player_info(order), columns=["Player Team (Bye)", "POS"])
+    df.insert(0, "player_id", order)
+    return Response(df.to_csv(index=False), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={profile}.csv'})
+  return Response(pack(order), mimetype='application/octet-stream',
+                  headers={'Content-Disposition': f'attachment; filename={profile}.ids'})
+
+@app.route('/api/rankings/import', methods=['POST'])
+def import_rankings():
+  # Body: packed int32 ids (application/octet-stream) or a CSV with player_id or name / POS columns
+  profile = current_profile()
+  body = request.get_data()
+  try:
+    if request.mimetype == 'text/csv':
+      df = pd.read_csv(io.BytesIO(body))
+      if 'player_id' in df.columns:
+        ids = df['player_id'].astype(int).tolist()
+      else:
+        ids = player_ids(df["Player Team (Bye)"], df["POS"])
+    else:
+      ids = unpack(body)
+  except (ValueError, KeyError):
+    return jsonify({'status': 'error', 'error': 'unreadable rankings'}), 400
+  try:
+    ids = check_order(ids)
+  except ValueError as e:
+    return jsonify({'status': 'error', 'error': str(e)}), 400
+  replace_order(ids, profile)
+  invalidate_rankings_cache(profile)
+  return jsonify({'status': 'ok', 'profile': profile, 'count': len(ids)})
+
+@app.route('/api/adp_trend')
+def adp_trend():
+  # Biggest ADP risers and fallers over the last `days` days
+  platform = request.args.get('platform', 'sleeper')
+  days = request.args.get('days', adp_history.TREND_DAYS, type=int)
+  limit = request.args.get('limit', 10, type=int)
+  trend = adp_history.trend(platform, days)
+  trend = trend[trend.notna() & (trend != 0)].sort_values(kind="stable")
+  def players(part):
+    info = player_info(part.index)
+    return [{'player_id': int(pid), 'player': name, 'pos': pos, 'trend': round(float(t), 1)}
+            for pid, (name, pos), t in zip(part.index, info, part)]
+  return jsonify({'platform': platform, 'days': days,
+                  'risers': players(trend[::-1][:limit]), 'fallers': players(trend[:limit])})
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+# Shared keep-alive session: every upstream request goes through one pooled
+# connection per host instead of a fresh TCP/TLS handshake per requests.get.
+ADP_FETCH_TIMEOUT = (3.05, float(os.environ.get("ADP_FETCH_TIMEOUT", "10")))  # (connect, read) seconds
+ADP_FETCH_DEADLINE = float(os.environ.get("ADP_FETCH_DEADLINE", "12"))       # wall clock for a parallel batch
+ADP_FETCH_RETRIES = int(os.environ.get("ADP_FETCH_RETRIES", "2"))
+USER_AGENT = "Mozilla/5.0 (compatible; fantasy-football-rankings)"
+# Offline mode: with a directory set, pages are served from recorded files
+# ("overall.php" -> "<dir>/overall.html") and nothing touches the network.
+# Responses carry an ETag of the file contents, so the snapshot cache's
+# conditional requests behave as they do against the live site.
+FIXTURES_DIR = os.environ.get("ADP_FIXTURES_DIR") or None
+
+metrics.describe("upstream_fetch_total", "counter", "Upstream page requests by host and HTTP status.")
+metrics.describe("upstream_fetch_seconds", "histogram", "Upstream page request latency by host and HTTP status.")
+
+_session = None
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="adp-fetch")
+
+
+def _build_session():
+    retry = Retry(
+        total=ADP_FETCH_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        _session = _build_session()
+    return _session
+
+
+def fixture_path(url, directory=None):
+    """Recorded file that stands in for ``url`` in offline mode."""
+    page = os.path.basename(url.split("?", 1)[0].rstrip("/"))
+    return os.path.join(directory or FIXTURES_DIR, os.path.splitext(page)[0] + ".html")
+
+
+def _fixture_response(url, headers):
+    response = requests.Response()
+    response.url = url
+    response.encoding = "utf-8"
+    try:
+        with open(fixture_path(url), "rb") as f:
+            body = f.read()
+    except OSError:
+        response.status_code = 404
+        response._content = b""
+        return response
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    response.headers["ETag"] = etag
+    if headers.get("If-None-Match") == etag:
+        response.status_code = 304
+        response._content = b""
+    else:
+        response.status_code = 200
+        response._content = body
+    return response
+
+
+def get(url, headers=None, timeout=None):
+    """GET ``url`` over the pooled session with a bounded timeout and retries."""
+    t0 = time.perf_counter()
+    status = "error"
+    try:
+        if FIXTURES_DIR:
+            response = _fixture_response(url, headers or {})
+        else:
+            response = get_session().get(url, headers=headers or {}, timeout=timeout or ADP_FETCH_TIMEOUT)
+        status = response.status_code
+        return response
+    finally:
+        host = urlsplit(url).hostname or ""
+        metrics.inc("upstream_fetch_total", host=host, status=status)
+        metrics.observe("upstream_fetch_seconds", time.perf_counter() - t0, host=host, status=status)
+
+
+def run_parallel(tasks, deadline=None):
+    """Run ``{name: callable}`` concurrently and return ``{name: result}`` for the
+    tasks that finished within ``deadline`` seconds without raising.
+
+    Tasks that miss the deadline keep running in the background; callers get a
+    partial result now and pick up the late ones on a later call.
+    """
+    if not tasks:
+        return {}
+    futures = {name: _executor.submit(fn) for name, fn in tasks.items()}
+    done, _ = wait(futures.values(), timeout=ADP_FETCH_DEADLINE if deadline is None else deadline)
+    results = {}
+    for name, future in futures.items():
+        if future in done and future.exception() is None:
+            results[name] = future.result()
+    return results
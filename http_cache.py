@@ -0,0 +1,122 @@
+import hashlib
+import os
+import zlib
+
+from flask import Response, current_app, make_response, request, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+# HTTP caching and compression for the pages.
+#
+# Pages get a weak ETag built from everything they are rendered from (ADP
+# snapshot, rankings version, draft state, settings, asset versions), computed
+# before any rendering, so a revalidation that matches costs a 304 and no
+# work. Responses are "private, no-cache": always revalidated, never shared.
+#
+# CSS/JS live in static/ and are linked with a content hash in the URL
+# (asset_url), so they are cached for a year and a changed file gets a new URL.
+#
+# Text responses over COMPRESS_MIN_BYTES are brotli (if installed) or gzip
+# compressed. Streamed pages are compressed chunk by chunk with a sync flush
+# per chunk, so the browser still renders rows as they arrive.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_TYPES = {"text/html", "text/css", "text/javascript", "application/javascript", "application/json",
+                  "text/plain"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ASSET_MAX_AGE = 365 * 86400
+
+_asset_hashes = {}  # { path: (mtime_ns, hash) }
+
+
+def asset_url(filename):
+    """URL of a static file with its content hash, for far-future caching."""
+    path = os.path.join(current_app.static_folder, filename)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _asset_hashes.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as f:
+            cached = _asset_hashes[path] = (mtime, hashlib.blake2b(f.read(), digest_size=6).hexdigest())
+    return url_for("static", filename=filename, v=cached[1])
+
+
+def etag(*parts):
+    """Weak ETag value for a page rendered from ``parts``."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def not_modified(tag):
+    """304 for ``tag`` if the client's copy is current, else None."""
+    if request.method not in ("GET", "HEAD") or not request.if_none_match.contains_weak(tag):
+        return None
+    return tagged(Response(status=304), tag)
+
+
+def tagged(body, tag):
+    response = make_response(body)
+    response.set_etag(tag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _encoding():
+    if brotli is not None and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compressor(encoding):
+    # (compress(chunk) including a flush, finish()) for one response body
+    if encoding == "br":
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        return lambda data: c.process(data) + c.flush(), c.finish
+    c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return lambda data: c.compress(data) + c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+
+def _compress_stream(chunks, encoding, charset):
+    compress, finish = _compressor(encoding)
+    for chunk in chunks:
+        data = compress(chunk.encode(charset) if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _compress(response):
+    if (response.status_code != 200 or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESS_TYPES):
+        return response
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    if response.is_streamed and not response.direct_passthrough:
+        response.response = _compress_stream(response.response, encoding, response.mimetype_params.get("charset", "utf-8"))
+        response.headers.pop("Content-Length", None)
+    else:
+        response.direct_passthrough = False  # static files: read the (small) file in
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        compress, finish = _compressor(encoding)
+        response.set_data(compress(data) + finish())
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # The encoded body differs byte for byte from the identity one
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        response.set_etag(tag, weak=True)
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def _finish(response):
+        if request.endpoint == "static" and request.args.get("v"):
+            response.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+        return _compress(response)
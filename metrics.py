@@ -0,0 +1,188 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, g, request
+
+# Request and pipeline instrumentation, exposed in Prometheus text format on
+# /metrics. Counters and histograms live in this process; with several worker
+# processes each one reports its own and the scraper sums them per instance.
+#
+# span("stage") times one pipeline stage into the stage_seconds histogram and,
+# inside a request, into that response's Server-Timing header, so a slow page
+# shows in the browser's network panel which stage the time went to.
+#
+# Profiling: with PROFILE_DIR set, any request carrying ?_profile=1 is sampled
+# every PROFILE_INTERVAL seconds and written to PROFILE_DIR as folded stacks
+# ("frame;frame;frame count" lines), the input format of flamegraph.pl and
+# speedscope.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or None
+PROFILE_INTERVAL = 0.001  # seconds between stack samples
+
+_counters = {}    # { (name, labels): value }
+_histograms = {}  # { (name, labels): [bucket counts..., +Inf count, sum] }
+_help = {}        # { name: (type, help text) }
+_lock = threading.Lock()
+_local = threading.local()  # .spans: [(stage, seconds)] for the request on this thread
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def describe(name, kind, text):
+    _help[name] = (kind, text)
+
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+
+@contextmanager
+def span(stage):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        observe("stage_seconds", seconds, stage=stage)
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append((stage, seconds))
+
+
+def timed(stage):
+    """Decorator form of ``span``."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+describe("stage_seconds", "histogram", "Time spent in each pipeline stage.")
+describe("http_request_seconds", "histogram", "Request latency by endpoint, method and status.")
+describe("http_requests_total", "counter", "Requests by endpoint, method and status.")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+    lines, seen = [], set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {_help.get(name, (kind, name))[1]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {value}")
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        for bound, count in zip(BUCKETS, hist):
+            lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {hist[-2]}")
+        lines.append(f"{name}_sum{_labels(labels)} {hist[-1]}")
+        lines.append(f"{name}_count{_labels(labels)} {hist[-2]}")
+    return "\n".join(lines) + "\n"
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack until stopped; ``folded()`` gives collapsed stacks."""
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks = {}
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(PROFILE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def init_app(app):
+    """Request timing middleware, the Server-Timing header, /metrics and ?_profile=1."""
+
+    @app.before_request
+    def _start():
+        _local.spans = []
+        g.metrics_start = time.perf_counter()
+        if PROFILE_DIR and request.args.get("_profile") == "1":
+            g.sampler = _Sampler(threading.get_ident())
+            g.sampler.start()
+
+    @app.after_request
+    def _finish(response):
+        seconds = time.perf_counter() - g.get("metrics_start", time.perf_counter())
+        labels = {"endpoint": request.endpoint or "unknown", "method": request.method,
+                  "status": response.status_code}
+        inc("http_requests_total", **labels)
+        observe("http_request_seconds", seconds, **labels)
+        spans = getattr(_local, "spans", None) or []
+        _local.spans = None
+        timing = [f"{stage.replace(' ', '-')};dur={s * 1e3:.1f}" for stage, s in spans]
+        response.headers["Server-Timing"] = ", ".join(timing + [f"total;dur={seconds * 1e3:.1f}"])
+        sampler = g.pop("sampler", None)
+        if sampler is not None:
+            # Streamed bodies finish after this point; their profile covers
+            # the handler only
+            sampler.done.set()
+            sampler.join()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{labels['endpoint']}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(sampler.folded())
+            response.headers["X-Profile"] = os.path.basename(path)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
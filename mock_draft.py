@@ -0,0 +1,179 @@
+"""Batch mock drafts: how does my saved ranking order do from every draft slot?
+
+One team drafts by the order of a saved ranking profile (--profile);
+the other teams are bots picking by noisy ADP, the same model as the draft
+board's availability column. Every slot is run against every platform in the
+ADP fixtures. Each batch of drafts is simulated as one set of (drafts x players)
+arrays, and batches are spread over a process pool whose workers receive the
+read-only player arrays once, at start-up. No network access is needed.
+
+Run from the repo root:  python mock_draft.py --drafts 500
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import rankings
+from adp_sources import KEY_COLS, fixture_frames, wide_adp_frame
+from availability import AVAIL_NOISE
+from vor import DEFAULT_LINEUP, LeagueSettings, ValueBoard, rank_scores
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "adp")
+BATCH_DRAFTS = 250            # drafts simulated together in one task
+EXTRA_CAPS = {"QB": 1, "TE": 1, "K": 0, "DST": 0}  # most a team takes beyond its starters
+
+_shared = {}  # read-only arrays, set once per worker by _init_worker
+
+
+def _init_worker(shared):
+    _shared.update(shared)
+
+
+def _player_arrays(wide, column, order, positions, settings):
+    adp = pd.to_numeric(wide[column], errors="coerce").to_numpy(dtype=float, copy=True)
+    n = len(adp)
+    # No ADP on this platform: after everyone who has one
+    missing = np.isnan(adp)
+    adp[missing] = np.nanmax(adp, initial=0) + 1 + np.arange(missing.sum())
+    adp_rank = np.empty(n)
+    adp_rank[np.argsort(adp, kind="stable")] = np.arange(1, n + 1)
+    # My order first, then anyone it doesn't list by ADP
+    position_in_order = {pid: i for i, pid in enumerate(order)}
+    mine = np.array([position_in_order.get(pid, len(order) + r) for pid, r in zip(wide["player_id"], adp_rank)], dtype=float)
+    pos = np.array([positions.index(p) if p in positions else len(positions) for p in wide["POS"]], dtype=np.int64)
+    score = 100 * rank_scores(adp_rank, settings.teams)
+    return {
+        "adp": adp,
+        "mine": mine,
+        "pos": pos,
+        "score": score,
+        # Pre-draft value over replacement: score minus the position's replacement level
+        "vor": ValueBoard(wide["player_id"], wide["POS"], score, settings).values,
+    }
+
+
+def _simulate(platform, slot, drafts, seed):
+    """Run ``drafts`` mock drafts with me at ``slot`` (1-based); return summed outcomes."""
+    p = _shared["platforms"][platform]
+    teams, rounds, caps = _shared["teams"], _shared["rounds"], _shared["caps"]
+    adp, mine, pos, score, vor = p["adp"], p["mine"], p["pos"], p["score"], p["vor"]
+    n = len(adp)
+    rng = np.random.default_rng(seed)
+    noisy = adp + rng.standard_normal((drafts, n)) * np.maximum(1.0, AVAIL_NOISE * adp)
+    available = np.ones((drafts, n), dtype=bool)
+    counts = np.zeros((drafts, teams, len(caps)), dtype=np.int16)
+    rows = np.arange(drafts)
+    my_picks = np.empty((drafts, rounds), dtype=np.int64)
+    my_pick_no = np.empty(rounds)
+    for pick in range(teams * rounds):
+        rnd, i = divmod(pick, teams)
+        team = i if rnd % 2 == 0 else teams - 1 - i
+        key = mine if team == slot - 1 else noisy
+        ok = available & (counts[:, team, :] < caps)[:, pos]
+        choice = np.where(ok, key, np.inf).argmin(axis=1)
+        stuck = ~ok[rows, choice]
+        if stuck.any():
+            # Every eligible player is gone: take the best available regardless of caps
+            k = key if key.ndim == 1 else key[stuck]
+            choice[stuck] = np.where(available[stuck], k, np.inf).argmin(axis=1)
+        available[rows, choice] = False
+        counts[rows, team, pos[choice]] += 1
+        if team == slot - 1:
+            my_picks[:, rnd] = choice
+            my_pick_no[rnd] = pick + 1
+
+    # Starting lineup (best scores per position, then flex from what's left), valued over replacement
+    order = np.argsort(-score[my_picks], axis=1)
+    picks = np.take_along_axis(my_picks, order, axis=1)
+    roster_pos = pos[picks]
+    starting = np.zeros(picks.shape, dtype=bool)
+    for code, count in _shared["starters"]:
+        is_pos = roster_pos == code
+        starting |= is_pos & (np.cumsum(is_pos, axis=1) <= count)
+    for eligible in _shared["flex"]:
+        is_flex = np.isin(roster_pos, eligible) & ~starting
+        starting |= is_flex & (np.cumsum(is_flex, axis=1) <= 1)
+    reach = np.maximum(0.0, adp[my_picks] - my_pick_no)
+    return {
+        "platform": platform,
+        "slot": slot,
+        "drafts": drafts,
+        "value": float((vor[picks] * starting).sum()),
+        "reach": float(reach.sum()),
+        "positions": counts[:, slot - 1, :].sum(axis=0).astype(float),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=500, help="drafts per platform and slot")
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--lineup", default=DEFAULT_LINEUP)
+    parser.add_argument("--platform", action="append", help="platform column (default: all)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default=rankings.DEFAULT_PROFILE, help="ranking profile my team drafts by")
+    args = parser.parse_args()
+
+    settings = LeagueSettings.parse(args.teams, args.lineup)
+    wide = wide_adp_frame(fixture_frames(args.fixtures))
+    if wide.empty:
+        parser.error(f"no ADP fixtures found in {args.fixtures}")
+    columns = args.platform or [c for c in wide.columns if c not in KEY_COLS + ["player_id"]]
+    order = rankings.current_order(args.profile).tolist()
+    if not order:
+        print("No saved ranking order: my team drafts by straight ADP on each platform.")
+
+    positions = [pos for pos, _ in settings.starters]
+    positions += sorted({p for eligible in settings.flex for p in eligible} - set(positions))
+    starters = dict(settings.starters)
+    rounds = settings.rounds
+    caps = np.array([starters.get(p, 0) + EXTRA_CAPS.get(p, rounds) for p in positions] + [0], dtype=np.int16)
+    shared = {
+        "teams": settings.teams,
+        "rounds": rounds,
+        "caps": caps,
+        "starters": [(positions.index(p), c) for p, c in settings.starters],
+        "flex": [[positions.index(p) for p in eligible if p in positions] for eligible in settings.flex],
+        "platforms": {c: _player_arrays(wide, c, order, positions, settings) for c in columns},
+    }
+
+    tasks = []
+    for c in columns:
+        for slot in range(1, settings.teams + 1):
+            for start in range(0, args.drafts, BATCH_DRAFTS):
+                tasks.append((c, slot, min(BATCH_DRAFTS, args.drafts - start), args.seed + len(tasks)))
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        results = list(pool.map(_simulate, *zip(*tasks)))
+    elapsed = time.perf_counter() - t0
+
+    totals = {}
+    for r in results:
+        t = totals.setdefault((r["platform"], r["slot"]), {"drafts": 0, "value": 0.0, "reach": 0.0, "positions": 0})
+        t["drafts"] += r["drafts"]
+        t["value"] += r["value"]
+        t["reach"] += r["reach"]
+        t["positions"] = t["positions"] + r["positions"]
+    report = pd.DataFrame([
+        {"Platform": c, "Slot": slot, "Roster Value": t["value"] / t["drafts"], "Reach Cost": t["reach"] / t["drafts"],
+         **dict(zip(positions, t["positions"][:len(positions)] / t["drafts"]))}
+        for (c, slot), t in totals.items()
+    ])
+    pd.set_option("display.width", 200)
+    for c in columns:
+        print(f"\n== {c} ==")
+        print(report[report["Platform"] == c].drop(columns="Platform").to_string(index=False, float_format="%.1f"))
+    print(f"\n{args.drafts * len(columns) * settings.teams} drafts of {settings.teams} teams x {rounds} rounds "
+          f"in {elapsed:.2f}s on {args.workers} workers")
+    print("Roster Value: starting lineup's summed value over replacement (draft board VOR scale); "
+          "Reach Cost: picks taken ahead of ADP, summed per draft; positions: average players drafted.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import difflib
+import re
+import unicodedata
+
+import numpy as np
+
+import db
+
+# Canonical player identity. Every "Player Team (Bye)" string we see (from any
+# ADP page or the rankings file) resolves to one integer player id:
+#   1. exact alias hit (the same string and POS seen before),
+#   2. canonical key: normalized name (no accents, punctuation or Jr./III
+#      suffixes) plus POS,
+#   3. fuzzy match within a block of same-POS players sharing a last-name
+#      initial, for spelling differences between sources.
+# Ids, canonical keys and aliases are persisted, so joins across sources and
+# the saved rankings are integer joins on player_id.
+FUZZY_MIN_RATIO = 0.92           # accept a fuzzy name match on its own
+FUZZY_MIN_RATIO_SAME_TEAM = 0.85  # ...or at this ratio when the team also matches
+
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_TEAM_ALIASES = {"JAC": "JAX", "WSH": "WAS", "LA": "LAR", "KCC": "KC", "TAM": "TB", "GNB": "GB",
+                 "NWE": "NE", "NOR": "NO", "SFO": "SF", "LVR": "LV", "OAK": "LV", "SD": "LAC"}
+_POS_ALIASES = {"D/ST": "DST", "DEF": "DST", "PK": "K"}
+_DISPLAY_RE = re.compile(r"^(?P<name>.*?)\s+(?P<team>[A-Z]{2,3})\s+\((?P<bye>[^)]*)\)$")
+
+_by_alias = {}  # { "Player Team (Bye)|POS": id }
+_by_key = {}    # { canonical key: id }
+_blocks = {}    # { (POS, initial): [(normalized name, team, id)] }
+_info = {}      # { id: (display, POS) } latest display string seen
+_loaded = False
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS players (id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS player_aliases (alias TEXT PRIMARY KEY, player_id INTEGER NOT NULL)",
+]
+_PLAYER_COLUMNS = {"display": "TEXT", "pos": "TEXT", "team": "TEXT"}
+
+
+def normalize_name(name):
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    text = re.sub(r"[^a-z0-9 ]+", "", text.lower().replace("-", " "))
+    return " ".join(t for t in text.split() if t not in _SUFFIXES)
+
+
+def normalize_team(team):
+    team = (team or "").upper()
+    return _TEAM_ALIASES.get(team, team)
+
+
+def normalize_pos(pos):
+    pos = re.sub(r"\d+", "", str(pos)).upper().strip()
+    return _POS_ALIASES.get(pos, pos)
+
+
+def parse_display(display):
+    """Split "Name TEAM (bye)" into (name, team, bye); team/bye are "" when absent."""
+    match = _DISPLAY_RE.match(str(display).strip())
+    if not match:
+        return str(display).strip(), "", ""
+    return match["name"], normalize_team(match["team"]), match["bye"]
+
+
+def canonical_key(display, pos):
+    name, _, _ = parse_display(display)
+    return f"{normalize_name(name)}|{normalize_pos(pos)}"
+
+
+def _block(norm_name, pos):
+    last = norm_name.split()[-1] if norm_name else ""
+    return (pos, last[:1])
+
+
+def _index(pid, key, display, pos, team):
+    _by_key[key] = pid
+    _info[pid] = (display, pos)
+    norm_name = key.split("|", 1)[0]
+    _blocks.setdefault(_block(norm_name, pos), []).append((norm_name, team, pid))
+
+
+def _load():
+    global _loaded
+    for sql in _SCHEMA:
+        db.execute(sql)
+    have = {row[1] for row in db.query("PRAGMA table_info(players)")}
+    for col, kind in _PLAYER_COLUMNS.items():
+        if col not in have:
+            db.execute(f"ALTER TABLE players ADD COLUMN {col} {kind}")
+    for pid, key, display, pos, team in db.query("SELECT id, key, display, pos, team FROM players"):
+        if "(" in key:
+            # Raw "Player Team (Bye)|POS" key from before canonical ids
+            raw_display, _, raw_pos = key.rpartition("|")
+            canon = canonical_key(raw_display, raw_pos)
+            if canon in _by_key:
+                _by_alias[key] = _by_key[canon]
+                continue
+            _by_alias[key] = pid
+            db.execute("UPDATE players SET key = ?, display = ?, pos = ?, team = ? WHERE id = ?",
+                       (canon, raw_display, normalize_pos(raw_pos), parse_display(raw_display)[1], pid))
+            key, display, pos, team = canon, raw_display, normalize_pos(raw_pos), parse_display(raw_display)[1]
+        _index(pid, key, display or "", pos or key.rpartition("|")[2], team or "")
+    _by_alias.update(db.query("SELECT alias, player_id FROM player_aliases"))
+    _loaded = True
+
+
+def _fuzzy(norm_name, pos, team, claimed):
+    best, best_ratio = None, 0.0
+    # The cheap upper bounds skip candidates that can't beat the best so far
+    # or reach the lowest accepted ratio
+    matcher = difflib.SequenceMatcher(None, norm_name)
+    floor = min(FUZZY_MIN_RATIO, FUZZY_MIN_RATIO_SAME_TEAM)
+    for cand_name, cand_team, pid in _blocks.get(_block(norm_name, pos), ()):
+        if pid in claimed:
+            continue
+        matcher.set_seq2(cand_name)
+        bound = max(best_ratio, floor)
+        if matcher.real_quick_ratio() < bound or matcher.quick_ratio() < bound:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best_ratio:
+            best, best_ratio = (pid, cand_team), ratio
+    if best is None:
+        return None
+    pid, cand_team = best
+    if best_ratio >= FUZZY_MIN_RATIO or (best_ratio >= FUZZY_MIN_RATIO_SAME_TEAM and team and team == cand_team):
+        return pid
+    return None
+
+
+def _new_player(key, display, pos, team):
+    db.execute("INSERT OR IGNORE INTO players (key, display, pos, team) VALUES (?, ?, ?, ?)",
+               (key, display, pos, team))
+    pid = db.query("SELECT id FROM players WHERE key = ?", (key,))[0][0]
+    _index(pid, key, display, pos, team)
+    return pid
+
+
+def _resolve(display, pos, claimed):
+    name, team, _ = parse_display(display)
+    norm_name, pos = normalize_name(name), normalize_pos(pos)
+    key = f"{norm_name}|{pos}"
+    pid = _by_key.get(key)
+    if pid is not None and pid in claimed:
+        # Two different players share a name and position: tell them apart by team
+        key = f"{key}|{team}"
+        pid = _by_key.get(key)
+    if pid is None:
+        pid = _fuzzy(norm_name, pos, team, claimed)
+    if pid is None:
+        pid = _new_player(key, display, pos, team)
+    return pid
+
+
+def player_ids(names, positions):
+    """Canonical integer id for each ("Player Team (Bye)", POS) pair.
+
+    New strings are resolved once (canonical key, then fuzzy match, then a new
+    id) and remembered as aliases, so repeat calls are plain dict lookups.
+    """
+    with db.lock:
+        if not _loaded:
+            _load()
+        aliases = [f"{n}|{p}" for n, p in zip(names, positions)]
+        new_aliases = [a for a in dict.fromkeys(aliases) if a not in _by_alias]
+        if new_aliases:
+            # Ids already spoken for by other rows of this batch can't be fuzzy-matched again
+            claimed = {_by_alias[a] for a in aliases if a in _by_alias}
+            rows, seen = [], []
+            for alias in new_aliases:
+                display, _, pos = alias.rpartition("|")
+                pid = _resolve(display, pos, claimed)
+                claimed.add(pid)
+                _by_alias[alias] = pid
+                _info[pid] = (display, normalize_pos(pos))
+                rows.append((alias, pid))
+                seen.append((display, parse_display(display)[1], pid))
+            db.executemany("INSERT OR REPLACE INTO player_aliases (alias, player_id) VALUES (?, ?)", rows)
+            # Keep the latest team / bye string for display
+            db.executemany("UPDATE players SET display = ?, team = ? WHERE id = ?", seen)
+        return np.fromiter((_by_alias[a] for a in aliases), dtype=np.int64, count=len(aliases))
+
+
+def known_ids(names, positions):
+    """Id for each ("Player Team (Bye)", POS) pair already on record, -1 for the rest.
+
+    Like player_ids but read-only: exact aliases and canonical keys only, so
+    names from a request can't add players.
+    """
+    with db.lock:
+        if not _loaded:
+            _load()
+        return np.fromiter(
+            (_by_alias.get(f"{n}|{p}", _by_key.get(canonical_key(n, p), -1)) for n, p in zip(names, positions)),
+            dtype=np.int64, count=len(names),
+        )
+
+
+def player_info(ids):
+    """``[(display, POS)]`` last seen for each player id (("", "") if unknown)."""
+    with db.lock:
+        if not _loaded:
+            _load()
+        return [_info.get(int(pid), ("", "")) for pid in ids]
+
+
+def is_known(ids):
+    """Boolean array: which of ``ids`` are players on record."""
+    with db.lock:
+        if not _loaded:
+            _load()
+        return np.fromiter((int(pid) in _info for pid in ids), dtype=bool, count=len(ids))
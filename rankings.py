@@ -0,0 +1,301 @@
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+import db
+from players import is_known, known_ids, player_ids
+
+# Server-side state for "My Rankings": named profiles (say redraft, best ball
+# and superflex), each an order of canonical player ids (see players.py).
+#
+# Profiles live in one SQLite table, the order packed as a little-endian int32
+# array (pack / unpack, also the bulk import / export format). In memory each
+# is a read-only int64 array that a change replaces rather than modifies, so a
+# frame built from it can keep the reference and switching between profiles
+# is a dict lookup. Drag-drops arrive as moves, are applied to a copy and
+# appended to ranking_moves; the packed order is only rewritten when that
+# journal is compacted, so a fast drag session costs one small insert per
+# request.
+#
+# Each profile's rev counts its changes and is stored with it, so it is the
+# same in every worker process: a process that finds a different rev in
+# SQLite than the one it holds reloads the profile (_sync), and writes happen
+# in a BEGIN IMMEDIATE transaction after that check, so a worker can't write
+# back an order that another one has since changed.
+#
+# Before profiles there was one order in my_rankings.csv plus
+# my_rankings.journal; if present they become the default profile.
+DEFAULT_PROFILE = "default"
+MAX_PROFILE_NAME = 32
+LEGACY_FILE = "my_rankings.csv"
+LEGACY_JOURNAL = "my_rankings.journal"
+COMPACT_EVERY = 200   # journal entries before folding them into the packed order
+_MOVE_HISTORY = 1000  # recent moves kept so cached frames can catch up in place
+PACKED_DTYPE = "<i4"
+
+KEY_COLS = ["Player Team (Bye)", "POS"]
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS ranking_profiles ("
+    " name TEXT PRIMARY KEY, ids BLOB NOT NULL, rev INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS ranking_moves ("
+    " profile TEXT NOT NULL, player_id INTEGER NOT NULL, src INTEGER NOT NULL, dst INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ranking_moves_profile ON ranking_moves (profile)",
+]
+_ready = False
+_lock = threading.Lock()
+_profiles = {}  # { name: state }, loaded on first use
+# state: {
+#     "order": read-only int64 array of player ids (empty when nothing is saved),
+#     "seq": the stored rev this order is at; part of the rankings version,
+#     "base_seq": moves before this seq are no longer in "moves",
+#     "moves": [(seq, src, dst)] applied since base_seq,
+#     "journal_len": moves in ranking_moves not yet compacted,
+# }
+
+
+def profile_key(name):
+    """Normalized profile name ("Best Ball" -> "best-ball"), or None if nothing is left."""
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-") or None
+
+
+def pack(order):
+    """Player ids as compact little-endian int32 bytes."""
+    return np.asarray(order, dtype=PACKED_DTYPE).tobytes()
+
+
+def unpack(data):
+    """Inverse of ``pack``; raises ValueError if ``data`` isn't whole int32s."""
+    if len(data) % np.dtype(PACKED_DTYPE).itemsize:
+        raise ValueError("packed order length is not a multiple of 4")
+    return _frozen(np.frombuffer(data, dtype=PACKED_DTYPE))
+
+
+def check_order(ids):
+    """``ids`` as a read-only order; ValueError unless they are distinct, known player ids."""
+    order = _frozen(ids)
+    if (order < 0).any():
+        raise ValueError("negative player id")
+    if len(np.unique(order)) != len(order):
+        raise ValueError("duplicate player id")
+    if not is_known(order).all():
+        raise ValueError("unknown player id")
+    return order
+
+
+def _frozen(order):
+    order = np.array(order, dtype=np.int64)
+    order.flags.writeable = False
+    return order
+
+
+def _ensure_schema():
+    global _ready
+    if not _ready:
+        for sql in _SCHEMA:
+            db.execute(sql)
+        if "rev" not in {row[1] for row in db.query("PRAGMA table_info(ranking_profiles)")}:
+            db.execute("ALTER TABLE ranking_profiles ADD COLUMN rev INTEGER NOT NULL DEFAULT 0")
+        _ready = True
+
+
+def _read_legacy():
+    # my_rankings.csv and its journal, as a list of player ids
+    order = []
+    if os.path.exists(LEGACY_FILE):
+        try:
+            df = pd.read_csv(LEGACY_FILE)
+            if "player_id" not in df.columns:
+                # Saved before player ids: resolve the names once
+                order = [int(i) for i in player_ids(df[KEY_COLS[0]], df[KEY_COLS[1]])]
+            else:
+                order = [int(i) for i in df["player_id"]]
+        except Exception:
+            order = []
+    if os.path.exists(LEGACY_JOURNAL):
+        with open(LEGACY_JOURNAL, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    m = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash mid-append
+                if "player_id" not in m:
+                    m["player_id"] = int(player_ids([m["player"]], [m["pos"]])[0])
+                _apply(order, m["player_id"], m["from"], m["to"])
+    return order
+
+
+def _parse_moves(moves):
+    # [(player, POS, from, to)]
+    try:
+        return [(str(m["player"]), str(m["pos"]), int(m["from"]), int(m["to"])) for m in moves]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("malformed move") from None
+
+
+def _apply(order, pid, src, dst):
+    """Move player ``pid`` from rank ``src`` to ``dst`` (1-based); return the ranks used."""
+    n = len(order)
+    if not (1 <= src <= n) or order[src - 1] != pid:
+        # Client and server disagree on where the player is; trust the id
+        try:
+            src = order.index(pid) + 1
+        except ValueError:
+            return None
+    dst = max(1, min(n, dst))
+    if src == dst:
+        return None
+    order.insert(dst - 1, order.pop(src - 1))
+    return src, dst
+
+
+def _write(conn, name, order, rev):
+    # Store the packed order and drop the journal it now includes; caller is in a transaction
+    conn.execute("INSERT OR REPLACE INTO ranking_profiles (name, ids, rev) VALUES (?, ?, ?)", (name, pack(order), rev))
+    conn.execute("DELETE FROM ranking_moves WHERE profile = ?", (name,))
+
+
+def _stored_rev(conn, name):
+    row = conn.execute("SELECT rev FROM ranking_profiles WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def _load(conn, name):
+    # (order, journal length, rev) as stored
+    row = conn.execute("SELECT ids, rev FROM ranking_profiles WHERE name = ?", (name,)).fetchone()
+    order, rev = (unpack(row[0]).tolist(), row[1]) if row else ([], 0)
+    journal = conn.execute("SELECT player_id, src, dst FROM ranking_moves WHERE profile = ? ORDER BY rowid",
+                           (name,)).fetchall()
+    for pid, src, dst in journal:
+        _apply(order, pid, src, dst)
+    return order, len(journal), rev
+
+
+def _reset(state, order, journal_len, rev):
+    # The whole order changed: cached frames rebuild rather than replay moves
+    state.update(order=_frozen(order), journal_len=journal_len, seq=rev, base_seq=rev, moves=[])
+
+
+def _sync(name, conn=None):
+    # Caller holds _lock. The profile's state, reloaded if another process has changed it
+    _ensure_schema()
+    conn = conn or db.connect()
+    with db.lock:
+        state = _profiles.get(name)
+        if state is None:
+            order, journal_len, rev = _load(conn, name)
+            if not rev and not order and name == DEFAULT_PROFILE:
+                order = _read_legacy()
+                if order:
+                    rev = 1
+                    if conn.in_transaction:
+                        _write(conn, name, order, rev)
+                    else:
+                        with db.transaction() as tx:
+                            _write(tx, name, order, rev)
+            state = _profiles[name] = {}
+            _reset(state, order, journal_len, rev)
+        elif _stored_rev(conn, name) != state["seq"]:
+            _reset(state, *_load(conn, name))
+    return state
+
+
+def profiles():
+    """Names of the saved (non-empty) profiles, sorted, always including the default one."""
+    _ensure_schema()
+    names = {name for (name,) in db.query("SELECT name FROM ranking_profiles WHERE length(ids) > 0")}
+    return sorted(names | {DEFAULT_PROFILE})
+
+
+def current_order(profile=DEFAULT_PROFILE):
+    """The profile's order as a read-only array of player ids (empty when none is saved)."""
+    with _lock:
+        return _sync(profile)["order"]
+
+
+def version(profile=DEFAULT_PROFILE):
+    """The profile's stored rev, the same in every process; bumped by every change."""
+    with _lock:
+        return _sync(profile)["seq"]
+
+
+def moves_since(seq, profile=DEFAULT_PROFILE):
+    """``[(src, dst)]`` applied to the profile after version ``seq``, or None if they are no longer known."""
+    with _lock:
+        state = _sync(profile)
+        if seq < state["base_seq"]:
+            return None
+        return [(src, dst) for s, src, dst in state["moves"] if s > seq]
+
+
+def apply_moves(moves, seed=None, profile=DEFAULT_PROFILE):
+    """Apply ``[{"player", "pos", "from", "to"}]`` to the profile's order and journal them.
+
+    ``seed()`` supplies the starting order (list of player ids) when nothing
+    has been saved yet, i.e. the order the client was looking at. ValueError
+    for a malformed move; moves of players not on record are skipped.
+    """
+    moves = _parse_moves(moves)
+    ids = known_ids([m[0] for m in moves], [m[1] for m in moves])
+    # Outside the locks: building the seed order may fetch ADP
+    seeded = list(seed()) if seed is not None and not len(current_order(profile)) else None
+    with _lock:
+        with db.transaction() as conn:
+            state = _sync(profile, conn)
+            order = state["order"].tolist()
+            if order:
+                seeded = None
+            elif seeded is not None:
+                order = seeded
+            applied = []
+            for (_, _, src, dst), pid in zip(moves, ids.tolist()):
+                move = _apply(order, pid, src, dst)
+                if move is not None:
+                    applied.append((pid,) + move)
+            if not applied and seeded is None:
+                return 0
+            rev = state["seq"] + len(applied) + (seeded is not None)
+            journal_len = 0 if seeded is not None else state["journal_len"] + len(applied)
+            if seeded is not None or journal_len >= COMPACT_EVERY:
+                _write(conn, profile, order, rev)
+                journal_len = 0
+            else:
+                conn.executemany("INSERT INTO ranking_moves (profile, player_id, src, dst) VALUES (?, ?, ?, ?)",
+                                 [(profile, pid, src, dst) for pid, src, dst in applied])
+                conn.execute("UPDATE ranking_profiles SET rev = ? WHERE name = ?", (rev, profile))
+        if seeded is not None:
+            _reset(state, order, journal_len, rev)
+        else:
+            # Moves are numbered by the rev they bring the order to, so cached frames can replay them
+            first = state["seq"] + 1
+            state["moves"].extend((first + i, src, dst) for i, (_, src, dst) in enumerate(applied))
+            if len(state["moves"]) > _MOVE_HISTORY:
+                state["moves"] = state["moves"][-_MOVE_HISTORY:]
+                state["base_seq"] = state["moves"][0][0] - 1
+            state.update(order=_frozen(order), journal_len=journal_len, seq=rev)
+        return len(applied)
+
+
+def _overwrite(profile, order):
+    # Replace the profile's whole order in one step, after any change another process made
+    with _lock:
+        with db.transaction() as conn:
+            state = _sync(profile, conn)
+            rev = state["seq"] + 1
+            _write(conn, profile, order, rev)
+        _reset(state, order, 0, rev)
+
+
+def replace_order(ids, profile=DEFAULT_PROFILE):
+    """Overwrite the profile's whole order (bulk save / import) with player ids; creates the profile."""
+    _overwrite(profile, _frozen(ids).tolist())
+
+
+def delete_profile(profile):
+    """Forget a profile. Its row stays behind with an empty order, so revs only ever grow
+    (and a legacy my_rankings.csv isn't imported into the default one again)."""
+    _overwrite(profile, [])
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Bulk HTML rendering for the rankings and draft tables. Cells are built a
+# column at a time with vectorized string concatenation, Diff colors come from
+# one NumPy pass, and each rendered <tr> is cached against the version of the
+# frame it came from so a refresh only renders rows it has not seen before.
+STREAM_CHUNK_ROWS = 200
+
+_fragments = {}  # { table: {"version": hashable, "rows": {row key: "<tr>...</tr>"}} }
+
+
+def diff_colors(diff, max_diff):
+    """A CSS background for every Diff value.
+
+    Negative diffs fade toward green, positive toward red, clamped at
+    ``max_diff``; zero and missing values are white.
+    """
+    d = pd.to_numeric(pd.Series(diff), errors="coerce").to_numpy(dtype=float)
+    norm = np.clip(np.nan_to_num(d, nan=0.0), -max_diff, max_diff)
+    fade = np.round(255 - 155 * (np.abs(norm) / max_diff)).astype(int).astype(str)
+    neg = np.char.add(np.char.add("rgb(", fade), ",255,")
+    neg = np.char.add(np.char.add(neg, fade), ")")
+    pos = np.char.add(np.char.add("rgb(255,", fade), ",")
+    pos = np.char.add(np.char.add(pos, fade), ")")
+    colors = np.where(norm < 0, neg, np.where(norm > 0, pos, "#fff"))
+    return pd.Series(colors, index=getattr(diff, "index", None), dtype=object)
+
+
+def cell_text(series, blank_nan=False):
+    """String form of a column as the old f-string renderers printed it."""
+    text = series.astype(object).map(str)
+    if blank_nan:
+        text = text.where(series.notna(), "")
+    return text
+
+
+def trend_text(series):
+    """ADP movement as "+2.5" (rising) / "-1.0" (falling); blank without history."""
+    trend = pd.to_numeric(series, errors="coerce")
+    return trend.map("{:+.1f}".format).where(trend.notna(), "").astype(object)
+
+
+def render_rows(df, cells, attrs=None, close=True):
+    """Render ``<tr>`` fragments for ``df`` from a list of ``<td>`` Series.
+
+    ``cells`` holds one Series per column, each already wrapped in its
+    ``<td>`` markup and aligned to ``df.index``; ``attrs`` optionally adds
+    attribute text (e.g. `` data-idx='3'``) to each ``<tr>``. With
+    ``close=False`` the rows are left open for more cells.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    if attrs is None:
+        rows = "<tr>" + cells[0].astype(object)
+    else:
+        rows = "<tr" + attrs.astype(object) + ">" + cells[0].astype(object)
+    for cell in cells[1:]:
+        rows = rows + cell.astype(object)
+    return rows + "</tr>" if close else rows
+
+
+def td(series, style=None):
+    if style is None:
+        return "<td>" + series + "</td>"
+    return "<td style='" + style + "'>" + series + "</td>"
+
+
+def cached_rows(table, version, df, render, keys=None):
+    """Return the ``<tr>`` fragments for ``df`` in order, rendering only uncached rows.
+
+    ``render(sub_df)`` renders a slice of ``df``; fragments are keyed on ``keys``
+    (default: the frame index) and dropped when ``version`` changes.
+    """
+    entry = _fragments.get(table)
+    if entry is None or entry["version"] != version:
+        entry = _fragments[table] = {"version": version, "rows": {}}
+    cache = entry["rows"]
+    keys = list(df.index) if keys is None else list(keys)
+    missing = [i for i, k in enumerate(keys) if k not in cache]
+    if missing:
+        fresh = render(df.iloc[missing])
+        for i, fragment in zip(missing, fresh.tolist()):
+            cache[keys[i]] = fragment
+    return [cache[k] for k in keys]
+
+
+def iter_table(head, rows, tail, chunk=STREAM_CHUNK_ROWS):
+    """Yield a table as ``head``, batches of ``chunk`` rows, then ``tail``."""
+    yield head
+    for i in range(0, len(rows), chunk):
+        yield "".join(rows[i:i + chunk])
+    yield tail
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Player search for the draft board. Every lowercase "Player Team (Bye)" string
+# is broken into its 1-, 2- and 3-character substrings; each gram maps to the
+# sorted array of player ids containing it. A query of up to three characters
+# is a single dict lookup. A longer query intersects the postings of its
+# trigrams and then checks the few candidates left for a true substring match,
+# so the result is exactly what ``str.contains`` would return. Positions get
+# their own id arrays so the POS filter is one more intersection.
+GRAM = 3
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+_indexes = {}  # { key: SearchIndex } latest index per key (e.g. a platform)
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    def __init__(self, ids, names, positions, ranks=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.display = dict(zip(self.ids.tolist(), map(str, names)))
+        self.names = {pid: name.lower() for pid, name in self.display.items()}
+        self.pos = dict(zip(self.ids.tolist(), positions))
+        postings = {}
+        for pid, name in self.names.items():
+            for n in range(1, GRAM + 1):
+                for gram in _grams(name, n):
+                    postings.setdefault(gram, []).append(pid)
+        self._postings = {g: np.unique(np.asarray(p, dtype=np.int64)) for g, p in postings.items()}
+        by_pos = {}
+        for pid, pos in zip(self.ids.tolist(), positions):
+            by_pos.setdefault(pos, []).append(pid)
+        self._by_pos = {p: np.unique(np.asarray(v, dtype=np.int64)) for p, v in by_pos.items()}
+        self._all = np.unique(self.ids)
+        # Dense id -> rank table so results can be ordered without touching the frame
+        self._rank = np.full(int(self._all[-1]) + 1 if len(self._all) else 0, np.inf)
+        if ranks is not None:
+            self._rank[self.ids] = np.asarray(ranks, dtype=float)
+
+    def lookup(self, q="", pos=None):
+        """Sorted player ids whose name contains ``q`` (case-insensitive) at ``pos``."""
+        ids = self._by_pos.get(pos, _EMPTY) if pos else self._all
+        q = (q or "").lower()
+        if not q:
+            return ids
+        if len(q) <= GRAM:
+            return np.intersect1d(ids, self._postings.get(q, _EMPTY), assume_unique=True)
+        # Rarest trigrams first so the candidate set shrinks fastest
+        grams = sorted(_grams(q, GRAM), key=lambda g: len(self._postings.get(g, _EMPTY)))
+        for gram in grams:
+            ids = np.intersect1d(ids, self._postings.get(gram, _EMPTY), assume_unique=True)
+            if not len(ids):
+                return ids
+        names = self.names
+        return np.fromiter((pid for pid in ids.tolist() if q in names[pid]), dtype=np.int64)
+
+    def rank(self, pid):
+        rank = self._rank[pid]
+        return int(rank) if np.isfinite(rank) else None
+
+    def ranked(self, ids):
+        """``ids`` reordered by rank (best first)."""
+        return ids[np.argsort(self._rank[ids], kind="stable")]
+
+
+def get_index(key, version, df, column="Player Team (Bye)", rank="My Ranking"):
+    """Search index over ``df`` (indexed by player id), rebuilt only when ``version`` changes."""
+    entry = _indexes.get(key)
+    if entry is None or entry[0] != version:
+        ranks = pd.to_numeric(df[rank], errors="coerce") if rank in df.columns else None
+        entry = _indexes[key] = (version, SearchIndex(df.index, df[column], df["POS"], ranks))
+    return entry[1]
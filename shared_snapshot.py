@@ -0,0 +1,105 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # optional: without it every worker keeps its own frames
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where the dev server is a single process anyway
+    fcntl = None
+
+from adp_cache import ADP_CACHE_DIR
+
+# Computed rankings frames shared between worker processes. The worker that
+# rebuilds a frame writes it once as an Arrow IPC file, "<name>.<version>.arrow",
+# then bumps "<name>.version", a one-line pointer holding the version number,
+# publish time and the version of the source it was built from (the saved
+# order's rev), so a frame built from an outdated source can be passed over. Other workers read only the pointer on each request; when
+# the number moves they memory-map the new file, so numeric columns are used
+# straight from the page cache rather than re-read, re-parsed or copied per
+# process. Files are written to a temp name and renamed, so readers never see
+# a partial one.
+SNAPSHOT_DIR = os.environ.get("RANKINGS_SNAPSHOT_DIR", os.path.join(ADP_CACHE_DIR, "rankings"))
+KEEP_VERSIONS = 3  # older files are removed; workers still mapping them keep the inode alive
+
+
+def enabled():
+    return pa is not None
+
+
+def _pointer_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.version")
+
+
+def _data_path(name, version):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.{version}.arrow")
+
+
+def _replace(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def current_version(name):
+    """``(version, published_at, source)`` from the pointer file; ``(0, 0.0, None)`` if nothing is published."""
+    try:
+        with open(_pointer_path(name), encoding="ascii") as f:
+            version, published, source = f.read().split()
+        return int(version), float(published), int(source)
+    except (OSError, ValueError):
+        return 0, 0.0, None
+
+
+@contextmanager
+def build_lock(name):
+    """Cross-process lock so one worker at a time rebuilds and publishes ``name``."""
+    if fcntl is None or pa is None:
+        yield
+        return
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(os.path.join(SNAPSHOT_DIR, f"{name}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def publish(name, df, published, source):
+    """Write ``df`` (index included), built from ``source``, as the next version of ``name``; returns the version.
+
+    Callers hold ``build_lock(name)``.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    version = current_version(name)[0] + 1
+    table = pa.Table.from_pandas(df, preserve_index=True)
+
+    def write_table(path):
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def write_pointer(path):
+        with open(path, "w", encoding="ascii") as f:
+            f.write(f"{version} {published} {source}\n")
+
+    _replace(_data_path(name, version), write_table)
+    _replace(_pointer_path(name), write_pointer)
+    stale = _data_path(name, version - KEEP_VERSIONS)
+    if os.path.exists(stale):
+        os.remove(stale)
+    return version
+
+
+def load(name, version):
+    """Memory-map version ``version`` of ``name`` as a DataFrame (None if it is gone)."""
+    try:
+        source = pa.memory_map(_data_path(name, version), "r")
+        table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas(split_blocks=True)
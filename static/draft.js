@@ -0,0 +1,184 @@
+(function () {
+  // Picks, undo and redo go through the JSON API and patch the tables in place;
+  // the forms still work as a plain POST when scripts are unavailable.
+  // Every change in the room (ours or another watcher's) also arrives over
+  // SSE, so all updates below are idempotent.
+  const params = new URLSearchParams(window.location.search);
+  const root = document.getElementById('draft-root');
+  // The room goes with every request: the session only remembers the last room opened
+  const filters = {
+    room: root.dataset.room, platform: params.get('platform') || '', profile: document.getElementById('profile').value,
+    pos: params.get('pos') || '', q: params.get('q') || ''
+  };
+  const board = document.querySelector('#board-table tbody');
+  const draftedTable = document.getElementById('drafted-table');
+  const drafted = draftedTable.querySelector('tbody');
+  const empty = draftedTable.parentNode.querySelector('.empty');
+  function post(url, body) {
+    return fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(Object.assign({}, filters, body))
+    }).then(function (r) { return r.json(); });
+  }
+  function rowFromHtml(html) {
+    const tbody = document.createElement('tbody');
+    tbody.innerHTML = html;
+    return tbody.firstElementChild;
+  }
+  function find(tbody, idx) {
+    return tbody.querySelector("tr[data-idx='" + idx + "']");
+  }
+  function showDrafted() {
+    const hasRows = drafted.children.length > 0;
+    draftedTable.style.display = hasRows ? '' : 'none';
+    empty.style.display = hasRows ? 'none' : '';
+  }
+  function markDrafted(idx, tr) {
+    const row = find(board, idx);
+    if (row) row.remove();
+    if (tr && !find(drafted, idx)) drafted.insertBefore(tr, drafted.firstChild);
+    showDrafted();
+    refreshLive();
+  }
+  function restoreToBoard(idx, tr) {
+    const row = find(drafted, idx);
+    if (row) row.remove();
+    showDrafted();
+    refreshLive();
+    if (!tr || find(board, idx)) return;
+    const rank = parseInt(tr.dataset.rank, 10);
+    const next = Array.from(board.children).find(function (r) { return parseInt(r.dataset.rank, 10) > rank; });
+    board.insertBefore(tr, next || null);
+  }
+  // VOR and "Avail @ Next Pick" depend on every pick, so they are refetched after each change
+  let liveTimer = null;
+  function refreshLive() {
+    clearTimeout(liveTimer);
+    liveTimer = setTimeout(function () {
+      fetch('/api/draft/live?' + new URLSearchParams({ room: filters.room, platform: filters.platform, profile: filters.profile }))
+        .then(function (r) { return r.json(); }).then(function (res) {
+          if (res.status !== 'ok') return;
+          Object.keys(res.cells).forEach(function (css) {
+            const values = res.cells[css];
+            board.querySelectorAll('td.' + css).forEach(function (cell) {
+              const idx = cell.parentNode.dataset.idx;
+              if (values[idx] !== undefined) cell.textContent = values[idx];
+            });
+          });
+        });
+      refreshPlan();
+    }, 150);
+  }
+  // Draft plan: the position to take at each of my remaining picks
+  const planList = document.querySelector('#draft-plan ol');
+  function refreshPlan() {
+    if (!planList) return;
+    fetch('/api/draft/plan?' + new URLSearchParams({ room: filters.room, platform: filters.platform, profile: filters.profile }))
+      .then(function (r) { return r.json(); }).then(function (res) {
+        if (res.status !== 'ok') return;
+        planList.innerHTML = '';
+        res.steps.forEach(function (step) {
+          const li = document.createElement('li');
+          const names = step.targets.map(function (t) { return t.name + ' (' + Math.round(t.avail * 100) + '%)'; });
+          li.textContent = '#' + step.pick + ' ' + step.pos + ': ' + names.join(', ');
+          planList.appendChild(li);
+        });
+      });
+  }
+  // A pick made elsewhere: move our board row (if this view shows it) across
+  function draftedRowFrom(idx, count) {
+    const row = find(board, idx);
+    if (!row) return null;
+    const tr = document.createElement('tr');
+    tr.dataset.idx = idx;
+    [String(count)].concat(Array.from(row.children).slice(0, 5).map(function (td) { return td.textContent; }))
+      .forEach(function (text) {
+        const td = document.createElement('td');
+        td.textContent = text;
+        tr.appendChild(td);
+      });
+    return tr;
+  }
+  board.addEventListener('submit', function (e) {
+    e.preventDefault();
+    const idx = e.target.querySelector("input[name='drafted_idx']").value;
+    post('/api/draft/pick', { idx: idx }).then(function (res) {
+      if (res.status !== 'ok') return;
+      markDrafted(res.idx, res.drafted_row ? rowFromHtml(res.drafted_row) : null);
+    });
+  });
+  document.getElementById('undo-pick').addEventListener('submit', function (e) {
+    e.preventDefault();
+    post('/api/draft/undo', {}).then(function (res) {
+      if (res.status !== 'ok') return;
+      restoreToBoard(res.idx, res.board_row ? rowFromHtml(res.board_row) : null);
+    });
+  });
+  document.getElementById('redo-pick').addEventListener('submit', function (e) {
+    e.preventDefault();
+    post('/api/draft/redo', {}).then(function (res) {
+      if (res.status !== 'ok') return;
+      markDrafted(res.idx, res.drafted_row ? rowFromHtml(res.drafted_row) : null);
+    });
+  });
+  // Typeahead: as the search box changes, ask the search index which
+  // available players match, hide the board rows that don't and offer the
+  // best-ranked names as suggestions. Rows the page was loaded without can't
+  // be shown this way, so widening a loaded search still needs Apply.
+  const search = document.getElementById('q');
+  const suggest = document.getElementById('player-suggest');
+  let searchTimer = null;
+  let searchSeq = 0;
+  function runSearch() {
+    const query = new URLSearchParams({
+      room: filters.room, platform: filters.platform, profile: filters.profile, pos: filters.pos, q: search.value.trim()
+    });
+    const mine = ++searchSeq;
+    fetch('/api/draft/search?' + query).then(function (r) { return r.json(); }).then(function (res) {
+      if (mine !== searchSeq) return;  // a newer keystroke already went out
+      filters.q = search.value.trim();
+      const url = new URL(window.location.href);
+      if (filters.q) url.searchParams.set('q', filters.q); else url.searchParams.delete('q');
+      history.replaceState(null, '', url);
+      const hits = new Set(res.ids.map(String));
+      Array.from(board.children).forEach(function (tr) { tr.hidden = !hits.has(tr.dataset.idx); });
+      suggest.innerHTML = '';
+      res.players.forEach(function (p) {
+        const opt = document.createElement('option');
+        opt.value = p.name;
+        opt.label = p.pos + ' #' + p.rank;
+        suggest.appendChild(opt);
+      });
+    });
+  }
+  function scheduleSearch() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(runSearch, 80);
+  }
+  search.addEventListener('input', scheduleSearch);
+  // A different position or ranking profile needs rows the page doesn't have: reload with it
+  document.getElementById('pos').addEventListener('change', function () { search.form.submit(); });
+  document.getElementById('profile').addEventListener('change', function () { search.form.submit(); });
+  refreshPlan();
+  if (window.EventSource) {
+    const events = new EventSource('/api/draft/stream?' + new URLSearchParams({ room: filters.room, since: root.dataset.seq }));
+    function onPick(e) {
+      const data = JSON.parse(e.data);
+      if (!find(drafted, data.idx)) markDrafted(data.idx, draftedRowFrom(data.idx, data.count));
+    }
+    events.addEventListener('pick', onPick);
+    events.addEventListener('redo', onPick);
+    events.addEventListener('undo', function (e) {
+      const data = JSON.parse(e.data);
+      if (find(board, data.idx)) return;
+      restoreToBoard(data.idx, null);
+      const query = new URLSearchParams(Object.assign({ idx: data.idx }, filters));
+      fetch('/api/draft/row?' + query).then(function (r) { return r.json(); }).then(function (res) {
+        if (res.board_row) restoreToBoard(res.idx, rowFromHtml(res.board_row));
+      });
+    });
+    events.addEventListener('reset', function () { window.location.reload(); });
+    events.addEventListener('resync', function () { window.location.reload(); });
+  }
+})();
@@ -0,0 +1,77 @@
+const tbody = document.querySelector('#rankings-table tbody');
+// Drag-drops are queued and sent as one batch of moves once dragging pauses
+let pendingMoves = [];
+let flushTimer = null;
+function queueMove(row, from, to) {
+  const player = row.children[1].textContent;
+  const last = pendingMoves[pendingMoves.length - 1];
+  if (last && last.player === player && last.to === from) {
+    last.to = to;  // same player dragged again: collapse into one move
+  } else {
+    pendingMoves.push({ player: player, pos: row.children[2].textContent, from: from, to: to });
+  }
+  clearTimeout(flushTimer);
+  flushTimer = setTimeout(flushMoves, 400);
+}
+function flushMoves() {
+  if (!pendingMoves.length) return;
+  const platform = document.getElementById('platform').value;
+  const profile = document.getElementById('profile').value;
+  const moves = pendingMoves;
+  pendingMoves = [];
+  fetch('/move_rankings', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ platform: platform, profile: profile, moves: moves }),
+    keepalive: true
+  });
+}
+window.addEventListener('pagehide', flushMoves);
+function updateDiffs() {
+  // First, update My Ranking and Diff/Color
+  Array.from(tbody.children).forEach(function(row, i) {
+    row.children[0].textContent = i + 1;
+    let adp = parseFloat(row.children[4].textContent); // ADP is now col 4
+    let diff = null;
+    if (!isNaN(adp)) {
+      diff = (i + 1) - adp;
+    }
+    let color = '#fff';
+    if (diff !== null) {
+      let maxDiff = 10;
+      let norm = Math.max(-maxDiff, Math.min(maxDiff, diff));
+      if (norm < 0) {
+        let pct = Math.abs(norm) / maxDiff;
+        let r = Math.round(255 - 155 * pct);
+        let g = 255;
+        let b = Math.round(255 - 155 * pct);
+        color = `rgb(${r},${g},${b})`;
+      } else if (norm > 0) {
+        let pct = norm / maxDiff;
+        let r = 255;
+        let g = Math.round(255 - 155 * pct);
+        let b = Math.round(255 - 155 * pct);
+        color = `rgb(${r},${g},${b})`;
+      }
+    }
+    row.children[5].textContent = diff !== null ? diff : '';
+    row.children[5].style.background = color;
+  });
+  // Now, update POS Rank for each row: one pass, counting players seen per POS
+  let seen = {};
+  Array.from(tbody.children).forEach(function(row) {
+    let pos = row.children[2].textContent;
+    seen[pos] = (seen[pos] || 0) + 1;
+    row.children[3].textContent = pos + seen[pos];
+  });
+}
+new Sortable(tbody, {
+  animation: 150,
+  onEnd: function (evt) {
+    updateDiffs();
+    if (evt.oldIndex !== evt.newIndex) {
+      queueMove(evt.item, evt.oldIndex + 1, evt.newIndex + 1);
+    }
+  }
+});
+updateDiffs();
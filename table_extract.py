@@ -0,0 +1,144 @@
+import re
+from html.parser import HTMLParser
+
+import pandas as pd
+
+try:
+    import lxml.html
+except ImportError:  # optional: fall back to the stdlib streaming parser
+    lxml = None
+
+# Pull one <table id="..."> out of a page straight into a DataFrame. The
+# FantasyPros ADP pages are mostly navigation and scripts around a single data
+# table, so we slice the table out of the raw string first and only parse that.
+_TABLE_CLOSE = "</table>"
+
+
+def _table_slice(html, table_id):
+    match = re.search(r"<table\b[^>]*\bid=[\"']?%s[\"'\s>]" % re.escape(table_id), html)
+    if not match:
+        return None
+    end = html.find(_TABLE_CLOSE, match.start())
+    if end == -1:
+        return None
+    return html[match.start():end + len(_TABLE_CLOSE)]
+
+
+def _frame(headers, columns, nrows):
+    # Pad ragged rows (missing trailing cells) the way pd.DataFrame(rows) would
+    for col in columns:
+        col.extend([None] * (nrows - len(col)))
+    width = max(len(headers), len(columns))
+    columns.extend([[None] * nrows for _ in range(width - len(columns))])
+    names = headers + list(range(len(headers), width))
+    if not names:
+        return pd.DataFrame()
+    df = pd.DataFrame(dict(enumerate(columns)), columns=range(width))
+    df.columns = names
+    return df
+
+
+def _extract_lxml(fragment):
+    table = lxml.html.fragment_fromstring(fragment)
+    headers = [th.text_content().strip() for th in table.xpath("thead//th")]
+    rows = table.xpath("tbody/tr[td]")
+    widths = {len(tr.findall("td")) for tr in rows}
+    if len(widths) <= 1:
+        # Rectangular table: pull each column with one XPath query
+        width = widths.pop() if widths else 0
+        columns = [
+            [td.text_content().strip() for td in table.xpath(f"tbody/tr[td]/td[{k}]")]
+            for k in range(1, width + 1)
+        ]
+        return _frame(headers, columns, len(rows))
+    columns = []
+    for i, tr in enumerate(rows):
+        for k, td in enumerate(tr.findall("td")):
+            if k == len(columns):
+                columns.append([None] * i)
+            column = columns[k]
+            column.extend([None] * (i - len(column)))
+            column.append(td.text_content().strip())
+    return _frame(headers, columns, len(rows))
+
+
+class _TableParser(HTMLParser):
+    """Streaming fallback: only buffers text inside the target table."""
+
+    def __init__(self, table_id):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.depth = 0
+        self.section = None
+        self.cell = None
+        self.col = 0
+        self.nrows = 0
+        self.headers = []
+        self.columns = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "table":
+            if self.depth or dict(attrs).get("id") == self.table_id:
+                self.depth += 1
+            return
+        if self.depth != 1:
+            return
+        if tag in ("thead", "tbody"):
+            self.section = tag
+        elif tag == "tr":
+            self.col = 0
+        elif tag in ("th", "td"):
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if not self.depth or self.done:
+            return
+        if tag == "table":
+            self.depth -= 1
+            self.done = self.depth == 0
+            return
+        if self.depth != 1 or self.cell is None or tag not in ("th", "td"):
+            return
+        text = "".join(self.cell).strip()
+        self.cell = None
+        if tag == "th" and self.section == "thead":
+            self.headers.append(text)
+        elif tag == "td" and self.section == "tbody":
+            if self.col == 0:
+                self.nrows += 1
+            if self.col == len(self.columns):
+                self.columns.append([])
+            column = self.columns[self.col]
+            column.extend([None] * (self.nrows - 1 - len(column)))
+            column.append(text)
+            self.col += 1
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+
+def _extract_stream(fragment, table_id):
+    parser = _TableParser(table_id)
+    parser.feed(fragment)
+    parser.close()
+    if not parser.done and not parser.depth:
+        return pd.DataFrame()
+    return _frame(parser.headers, parser.columns, parser.nrows)
+
+
+def extract_table(html, table_id="data"):
+    """Return the ``<table id=table_id>`` in ``html`` as a DataFrame of stripped cell text.
+
+    Header cells become column names; rows without any ``<td>`` are skipped.
+    Returns an empty DataFrame when the table is missing.
+    """
+    fragment = _table_slice(html, table_id)
+    if fragment is None:
+        return pd.DataFrame()
+    if lxml is not None:
+        return _extract_lxml(fragment)
+    return _extract_stream(fragment, table_id)
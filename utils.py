@@ -1,131 +1,151 @@
 import pandas as pd
-import os
-import requests
-from bs4 import BeautifulSoup
-
-def clean_pos_column(df):
-    if "POS" in df.columns:
-        df = df.copy()
-        df["POS"] = df["POS"].str.replace(r"\d+", "", regex=True)
-    return df
+import numpy as np
+import rankings
+import metrics
+import adp_history
+from render import cached_rows, cell_text, diff_colors, render_rows, td, trend_text
+from players import player_info
+from adp_sources import KEY_COLS, adp_version, platform_column, source_frames, wide_adp_frame
 
-def get_sleeper_adp():
-    url = "https://www.fantasypros.com/nfl/adp/overall.php"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return pd.DataFrame()
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", {"id": "data"})
-    if not table:
-        return pd.DataFrame()
-    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
-    rows = []
-    for tr in table.find("tbody").find_all("tr"):
-        cells = [td.text.strip() for td in tr.find_all("td")]
-        if cells:
-            rows.append(cells)
-    df = pd.DataFrame(rows, columns=headers)
-    df = clean_pos_column(df)
-    columns_to_keep = [col for col in ["Player Team (Bye)", "POS", "Team", "Sleeper"] if col in df.columns]
+def _source_columns(name, columns):
+    df = source_frames().get(name, pd.DataFrame())
+    columns_to_keep = [col for col in columns if col in df.columns]
     return df[columns_to_keep] if columns_to_keep else pd.DataFrame()
 
+def get_sleeper_adp():
+    return _source_columns("overall", ["Player Team (Bye)", "POS", "Team", "Sleeper"])
+
 def get_underdog_adp():
-    url = "https://www.fantasypros.com/nfl/adp/best-ball-overall.php"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return pd.DataFrame()
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", {"id": "data"})
-    if not table:
-        return pd.DataFrame()
-    headers = [th.text.strip() for th in table.find("thead").find_all("th")]
-    rows = []
-    for tr in table.find("tbody").find_all("tr"):
-        cells = [td.text.strip() for td in tr.find_all("td")]
-        if cells:
-            rows.append(cells)
-    df = pd.DataFrame(rows, columns=headers)
-    df = clean_pos_column(df)
-    columns_to_keep = [col for col in ["Player Team (Bye)", "POS", "Underdog"] if col in df.columns]
-    return df[columns_to_keep] if columns_to_keep else pd.DataFrame()
+    return _source_columns("best-ball-overall", ["Player Team (Bye)", "POS", "Underdog"])
+
+metrics.describe("rankings_frame_total", "counter",
+                 "load_rankings calls served from cache (hit), by replaying drag-drops (replay) or rebuilt.")
+
+# Rankings merged against a given snapshot version and rankings order
+_rankings_cache = {}  # { (platform, profile): (rankings_version, DataFrame) }
+# Per platform: the ADP frame indexed by player id that every profile's order is projected from
+_adp_frames = {}  # { platform: (adp version, DataFrame) }
 
 def join_adp_data(platform):
-    df_sleeper = get_sleeper_adp()
-    df_underdog = get_underdog_adp()
-    required_cols = ["Player Team (Bye)", "POS"]
-    if not all(col in df_sleeper.columns for col in required_cols):
-        return pd.DataFrame()
-    if not all(col in df_underdog.columns for col in required_cols):
+    # Every platform lives in the shared wide frame; selecting one is a projection
+    wide = wide_adp_frame()
+    if wide.empty:
         return pd.DataFrame()
-    merged = pd.merge(
-        df_sleeper,
-        df_underdog,
-        on=["Player Team (Bye)", "POS"],
-        how="outer"
-    )
-    # Choose ADP column based on platform
-    if platform == "sleeper":
-        merged["ADP"] = merged["Sleeper"]
-    else:
-        merged["ADP"] = merged["Underdog"]
-    columns_order = ["Player Team (Bye)", "POS", "ADP"]
-    merged = merged[columns_order]
+    merged = wide[["player_id"] + KEY_COLS].copy()
+    column = platform_column(platform)
+    merged["ADP"] = wide[column] if column else None
     return merged
 
-def load_rankings(platform):
-    filename = "my_rankings.csv"
-    adp_df = join_adp_data(platform).reset_index(drop=True)
-    if os.path.exists(filename):
-        try:
-            # Load only order columns
-            order_df = pd.read_csv(filename)
-            # Merge with current ADP data
-            merged = order_df.merge(adp_df[["Player Team (Bye)", "POS", "ADP"]], on=["Player Team (Bye)", "POS"], how="left")
-            merged["My Ranking"] = range(1, len(merged) + 1)
-            return merged
-        except Exception:
-            pass
-    # If no saved order, use ADP order
+def rankings_version(platform, profile=rankings.DEFAULT_PROFILE):
+    return (platform, profile, adp_version(), rankings.version(profile))
+
+def _adp_frame(platform, version):
+    cached = _adp_frames.get(platform)
+    if cached is None or cached[0] != version:
+        df = join_adp_data(platform)
+        if "player_id" in df.columns:
+            df = df.drop_duplicates("player_id")
+        cached = _adp_frames[platform] = (version, df.reset_index(drop=True))
+    return cached[1]
+
+def load_rankings(platform, profile=rankings.DEFAULT_PROFILE):
+    key = rankings_version(platform, profile)
+    cached = _rankings_cache.get((platform, profile))
+    if cached and cached[0] == key:
+        metrics.inc("rankings_frame_total", result="hit")
+        return cached[1].copy()
+    df = None
+    if cached and cached[0][:3] == key[:3]:
+        # Same ADP snapshot, only drag-drops since: replay them on the cached frame
+        moves = rankings.moves_since(cached[0][3], profile)
+        if moves is not None:
+            df = cached[1]
+            for src, dst in moves:
+                df = move_player(df, src, dst)
+            metrics.inc("rankings_frame_total", result="replay")
+    if df is None:
+        metrics.inc("rankings_frame_total", result="rebuild")
+        adp_df = _adp_frame(platform, key[2])
+        with metrics.span("rankings_merge"):
+            df = _merge_rankings(adp_df, rankings.current_order(profile))
+    _rankings_cache[(platform, profile)] = (key, df)
+    return df.copy()
+
+def _merge_rankings(adp_df, order):
+    if len(order):
+        # Project the ADP frame onto the saved order: one positional take by player id
+        if "ADP" in adp_df.columns:
+            rows = pd.Index(adp_df["player_id"]).get_indexer(order)
+            merged = adp_df.take(np.maximum(rows, 0)).reset_index(drop=True)
+            missing = rows < 0
+            if missing.any():
+                merged.loc[missing, "ADP"] = None
+        else:
+            merged = pd.DataFrame({col: None for col in KEY_COLS + ["ADP"]}, index=range(len(order)))
+            missing = np.ones(len(order), dtype=bool)
+        merged["player_id"] = np.asarray(order, dtype=np.int64)
+        # Ranked players missing from today's ADP keep their last-seen name
+        if missing.any():
+            info = player_info(merged.loc[missing, "player_id"])
+            merged.loc[missing, KEY_COLS] = info
+        merged["My Ranking"] = range(1, len(merged) + 1)
+        return merged
+    # If no saved order, use ADP order (players without an ADP go last)
+    adp_df = adp_df.copy()
+    if "ADP" in adp_df.columns:
+        adp = pd.to_numeric(adp_df["ADP"], errors="coerce")
+        adp_df = adp_df.iloc[adp.argsort(kind="stable")].reset_index(drop=True)
     adp_df["My Ranking"] = adp_df.index + 1
     return adp_df
+
+@metrics.timed("pos_rank")
 def add_pos_rank(df):
-    pos_ranks = []
-    for i, row in df.iterrows():
-        pos = row["POS"]
-        my_rank = row["My Ranking"]
-        y = (df[(df["POS"] == pos) & (df["My Ranking"] < my_rank)]).shape[0] + 1
-        pos_ranks.append(f"{pos}{y}")
-    df["POS Rank"] = pos_ranks
+    # POS Rank = 1 + players at the same position with a better My Ranking,
+    # i.e. a min-rank within each position group, computed in one pass
+    ranks = df.groupby("POS", sort=False)["My Ranking"].rank(method="min")
+    df["POS Rank"] = df["POS"].astype(str) + ranks.fillna(1).astype(int).astype(str)
+    return df
+
+def move_player(df, src, dst):
+    """Move the player at My Ranking ``src`` to ``dst`` (1-based, df ordered by My Ranking).
+
+    Only rows between the two ranks change: their My Ranking shifts by one and
+    the mover's position is renumbered within that slice. Every other player
+    keeps their relative order, so their POS Rank is already correct.
+    """
+    n = len(df)
+    if src == dst or not (1 <= src <= n and 1 <= dst <= n):
+        return df
+    lo, hi = min(src, dst) - 1, max(src, dst)
+    perm = np.arange(n)
+    if src < dst:
+        perm[lo:hi] = np.r_[lo + 1:hi, lo]
+    else:
+        perm[lo:hi] = np.r_[hi - 1, lo:hi - 1]
+    df = df.take(perm)
+    df.iloc[lo:hi, df.columns.get_loc("My Ranking")] = np.arange(lo + 1, hi + 1)
+    if "POS Rank" in df.columns:
+        pos = str(df["POS"].iat[dst - 1])
+        block = df.iloc[lo:hi]
+        rows = np.flatnonzero((block["POS"].astype(str) == pos).to_numpy())
+        # The slice held a contiguous run of this position's ranks; hand them
+        # back out in the new order
+        start = min(int(r[len(pos):]) for r in block["POS Rank"].to_numpy()[rows])
+        df.iloc[rows + lo, df.columns.get_loc("POS Rank")] = [f"{pos}{k}" for k in range(start, start + len(rows))]
     return df
 
+@metrics.timed("diff")
 def add_diff(df):
     df["ADP_num"] = df["ADP"].apply(safe_float)
     df["Diff"] = df["My Ranking"] - df["ADP_num"]
     return df
 
-def color_for_diff(diff, maxDiff=15):
-    color = "#fff"
-    if diff is not None:
-        try:
-            diff = float(diff)
-            norm = max(-maxDiff, min(maxDiff, diff))
-            if norm < 0:
-                pct = abs(norm) / maxDiff
-                r = round(255 - 155 * pct)
-                g = 255
-                b = round(255 - 155 * pct)
-                color = f"rgb({r},{g},{b})"
-            elif norm > 0:
-                pct = norm / maxDiff
-                r = 255
-                g = round(255 - 155 * pct)
-                b = round(255 - 155 * pct)
-                color = f"rgb({r},{g},{b})"
-        except:
-            color = "#fff"
-    return color
-
-def make_table_html(df, columns, table_id=None, color_diff=False):
+def add_trend(df, platform, days=adp_history.TREND_DAYS):
+    # ADP movement over the last `days` (positive = rising) from the ADP history
+    df["Trend"] = df["player_id"].map(adp_history.trend(platform, days))
+    return df
+
+def make_table_html(df, columns, table_id=None, color_diff=False, version=None):
     table_html = "<table"
     if table_id:
         table_html += f' id="{table_id}"'
@@ -133,17 +153,27 @@ def make_table_html(df, columns, table_id=None, color_diff=False):
     for col in columns:
         table_html += f"<th>{col}</th>"
     table_html += "</tr></thead><tbody>"
-    for _, row in df.iterrows():
-        table_html += "<tr>"
+
+    def render(part):
+        cells = []
         for col in columns:
-            if color_diff and col == "Diff":
-                color = color_for_diff(row.get(col, None))
-                table_html += f"<td style='background:{color};'>{row.get(col, '')}</td>"
+            if col not in part.columns:
+                cells.append(td(pd.Series("", index=part.index)))
+            elif color_diff and col == "Diff":
+                cells.append(td(cell_text(part[col]), "background:" + diff_colors(part[col], 15) + ";"))
+            elif col == "Trend":
+                cells.append(td(trend_text(part[col])))
             else:
-                table_html += f"<td>{row.get(col, '')}</td>"
-        table_html += "</tr>"
-    table_html += "</tbody></table>"
-    return table_html
+                cells.append(td(cell_text(part[col])))
+        return render_rows(part, cells)
+
+    # With a version, rows already rendered for that version are reused as-is
+    with metrics.span("render"):
+        if version is None:
+            rows = render(df).tolist()
+        else:
+            rows = cached_rows(f"table:{table_id}", version, df, render)
+    return table_html + "".join(rows) + "</tbody></table>"
 
 def safe_float(val):
     try:
@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Value over replacement. A player's value is their score minus the score of
+# the best player at that position who would not start in the league, the
+# "replacement" player. The ranking data has no point projections, so a
+# score comes from the ranking itself: it halves every VALUE_HALF_LIFE_ROUNDS
+# rounds of picks, a stand-in for the usual steep fall-off in points.
+#
+# Replacement levels are dynamic: as players are drafted, each position's
+# remaining starter demand shrinks along with its pool. A pick only moves the
+# levels of its own position (plus the flex-eligible positions when it spills
+# into flex), so ValueBoard recomputes values for those rows only.
+VALUE_HALF_LIFE_ROUNDS = 2
+FLEX_RULES = {"FLEX": ("RB", "WR", "TE"), "SFLEX": ("QB", "RB", "WR", "TE")}
+BENCH_SLOTS = {"BN", "BENCH"}
+DEFAULT_LINEUP = "1QB,2RB,2WR,1TE,1FLEX,1K,1DST,6BN"
+
+
+@dataclass(frozen=True)
+class LeagueSettings:
+    """League size and roster, e.g. ``LeagueSettings.parse(12, "1QB,2RB,2WR,1TE,1FLEX,6BN")``.
+
+    ``starters`` is ``((POS, count), ...)``, ``flex`` holds one tuple of
+    eligible positions per flex slot and ``bench`` counts bench spots.
+    """
+    teams: int = 12
+    starters: tuple = (("QB", 1), ("RB", 2), ("WR", 2), ("TE", 1), ("K", 1), ("DST", 1))
+    flex: tuple = (FLEX_RULES["FLEX"],)
+    bench: int = 6
+
+    @property
+    def rounds(self):
+        return sum(count for _, count in self.starters) + len(self.flex) + self.bench
+
+    @classmethod
+    def parse(cls, teams, lineup=DEFAULT_LINEUP):
+        starters, flex, bench = {}, [], None
+        for part in filter(None, (p.strip().upper() for p in lineup.split(","))):
+            match = re.fullmatch(r"(\d*)\s*([A-Z/]+)", part)
+            if not match:
+                raise ValueError(f"bad lineup slot: {part!r}")
+            count, pos = int(match[1] or 1), match[2]
+            if pos in FLEX_RULES:
+                flex.extend([FLEX_RULES[pos]] * count)
+            elif pos in BENCH_SLOTS:
+                bench = (bench or 0) + count
+            else:
+                starters[pos] = starters.get(pos, 0) + count
+        return cls(teams=teams, starters=tuple(starters.items()), flex=tuple(flex),
+                   bench=cls.bench if bench is None else bench)
+
+
+def rank_scores(ranks, teams):
+    """Score for each overall rank: 1.0 for the top pick, halving every VALUE_HALF_LIFE_ROUNDS rounds."""
+    ranks = np.asarray(ranks, dtype=float)
+    return np.exp2(-(ranks - 1) / (VALUE_HALF_LIFE_ROUNDS * teams))
+
+
+class ValueBoard:
+    """Values for one player pool that follow picks incrementally via ``sync``."""
+
+    def __init__(self, ids, positions, scores, settings):
+        self.settings = settings
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=float)
+        self._row = {pid: i for i, pid in enumerate(self.ids.tolist())}
+        positions = pd.Series(list(positions), dtype=object).fillna("")
+        # Rows of each position, best score first
+        self._by_pos = {
+            pos: rows[np.argsort(-self.scores[rows], kind="stable")]
+            for pos, rows in positions.groupby(positions, sort=False).indices.items()
+        }
+        self._pos_of = positions.to_numpy()
+        self.available = np.ones(len(self.ids), dtype=bool)
+        self.drafted = {pos: 0 for pos in self._by_pos}
+        self.picked = set()
+        self.replacement = {}
+        self.values = np.zeros(len(self.ids))
+        self._update(self._by_pos)
+
+    def _demand(self):
+        """Starter spots still open league-wide per position, flex included."""
+        teams = self.settings.teams
+        need, spill = {}, {}
+        for pos in self._by_pos:
+            slots = teams * dict(self.settings.starters).get(pos, 0)
+            need[pos] = max(0, slots - self.drafted[pos])
+            spill[pos] = max(0, self.drafted[pos] - slots)
+        # Flex slots go to the best players left over after dedicated starters,
+        # taken one slot type at a time (narrow rules first)
+        for eligible in sorted(self.settings.flex, key=len):
+            eligible = [p for p in eligible if p in self._by_pos]
+            used = min(teams, sum(spill[p] for p in eligible))
+            for p in eligible:
+                spill[p] -= min(spill[p], used)
+            open_slots = teams - used
+            if open_slots <= 0 or not eligible:
+                continue
+            pool = np.concatenate([self._pool(p)[need[p]:] for p in eligible])
+            best = pool[np.argsort(-self.scores[pool], kind="stable")[:open_slots]]
+            for p in eligible:
+                need[p] += int(np.count_nonzero(self._pos_of[best] == p))
+        return need
+
+    def _pool(self, pos):
+        rows = self._by_pos[pos]
+        return rows[self.available[rows]]
+
+    def _update(self, positions):
+        need = self._demand()
+        for pos in positions:
+            pool = self._pool(pos)
+            level = self.scores[pool[need[pos]]] if need[pos] < len(pool) else 0.0
+            if self.replacement.get(pos) == level:
+                continue
+            self.replacement[pos] = level
+            rows = self._by_pos[pos]
+            self.values[rows] = self.scores[rows] - level
+
+    def _touched(self, pos):
+        # Positions whose replacement level a pick at ``pos`` can move
+        touched = {pos}
+        for eligible in self.settings.flex:
+            if pos in eligible:
+                touched.update(p for p in eligible if p in self._by_pos)
+        return touched
+
+    def sync(self, picks):
+        """Bring the board in line with the drafted ``picks`` (player ids), touching only changed positions."""
+        picks = {pid for pid in picks if pid in self._row}
+        touched = set()
+        for pid, taken in [(p, True) for p in picks - self.picked] + [(p, False) for p in self.picked - picks]:
+            row = self._row[pid]
+            pos = self._pos_of[row]
+            self.available[row] = not taken
+            self.drafted[pos] += 1 if taken else -1
+            touched |= self._touched(pos)
+        self.picked = picks
+        if touched:
+            self._update(touched)
+
+    def series(self):
+        """Value for every player, indexed by player id."""
+        return pd.Series(self.values, index=pd.Index(self.ids, name="player_id"))